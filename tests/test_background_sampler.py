@@ -0,0 +1,46 @@
+from collections import Counter
+from pathlib import Path
+import random
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from tools.background_sampler import AliasTable, BackgroundSampler
+from tools.parse_backgrounds import parse_entries, roll_tables
+import pytest
+
+
+def test_parse_entries_keeps_only_printed_ranges():
+    entries = parse_entries(Path("Backgrounds.txt").read_text(encoding="utf-8").splitlines())
+    assert all(entry["roll_min"] is None and entry["roll_max"] is None for entry in entries)
+    assert {weight for rows in roll_tables(entries).values() for _, weight in rows} == {1}
+
+    explicit = parse_entries(["1. Family", "* 01-30 Farm: Tilled.", "* 31-100 Ship: Sailed."])
+    assert [(e["name"], e["roll_min"], e["roll_max"]) for e in explicit] == [("Farm", 1, 30), ("Ship", 31, 100)]
+    assert roll_tables(explicit) == {"Family": [("Farm", 30), ("Ship", 70)]}
+    for lines in (
+        ["1. Family", "* 01-30 Farm: Tilled.", "* Ship: Sailed."],
+        ["1. Family", "* 01-30 Farm: Tilled.", "* 40-100 Ship: Sailed."],
+        ["1. Family", "* 01-60 Farm: Tilled.", "* 50-100 Ship: Sailed."],
+    ):
+        with pytest.raises(ValueError):
+            parse_entries(lines)
+
+
+def test_alias_table_matches_weights():
+    table = AliasTable([1, 3, 0, 6])
+    rng = random.Random(1)
+    counts = Counter(table.sample(rng) for _ in range(20000))
+    assert counts[2] == 0
+    assert counts[3] / 20000 == pytest.approx(0.6, abs=0.02)
+    assert counts[1] / 20000 == pytest.approx(0.3, abs=0.02)
+    with pytest.raises(ValueError):
+        AliasTable([0, 0])
+
+
+def test_generation_is_reproducible():
+    sampler = BackgroundSampler.from_source(Path("Backgrounds.txt"))
+    first = sampler.generate(50, seed=42)
+    assert first == sampler.generate(50, seed=42)
+    assert first[:10] == sampler.generate(10, seed=42)
+    assert set(first[0]) == {"family", "childhood", "adolescence", "adulthood", "flaw", "inciting_incident"}
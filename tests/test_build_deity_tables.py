@@ -0,0 +1,48 @@
+from pathlib import Path
+import json
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from tools.build_deity_tables import DEFAULT_INPUT, DeityTables, build_tables
+from tools.parse_races import EntityStore, ParserConfig, RaceParser
+import pytest
+
+
+def test_cap_effects_reference_shared_tables():
+    parser = RaceParser(ParserConfig())
+    magnitude = parser._extract_magnitude("+3/Spiritual Modifier for Deity Relationship caps", "deity_relationship_cap")
+    assert magnitude == {"cap_table_id": "DRCAP_P03", "cap_step": 13, "per_spiritual": 3}
+    assert parser.store.deity_caps["DRCAP_P03"]["caps"] == [0, 13, 26, 39, 52, 65, 78]
+
+    store = EntityStore()
+    assert store.ensure_deity_cap_table(3) == store.ensure_deity_cap_table(3)
+    assert len(store.deity_caps) == 1
+
+
+def test_cap_effects_without_per_spiritual_bonus_are_unparsed():
+    parser = RaceParser(ParserConfig())
+    parser.add_effects_from_text("+1 spiritual mod deity relationship point cap at character tier increases", "FEAT_X")
+    parser.add_effects_from_text("+4 to Deity Relationship caps", "FEAT_X")
+
+    assert [effect["magnitude"]["cap_table_id"] for effect in parser.store.effects] == ["DRCAP_P01"]
+    assert parser.report.unparsed_effects == ["+4 to Deity Relationship caps"]
+
+
+def test_tables_answer_cap_and_worship_lookups():
+    payload = json.loads(Path(DEFAULT_INPUT).read_text(encoding="utf-8"))
+    tables = DeityTables.from_dict(json.loads(json.dumps(build_tables(payload).to_dict())))
+
+    assert tables.cap("Homma", 4, per_spiritual=3) == 52
+    assert tables.cap("DEITY_ZERA", 2) == 20
+    assert tables.worship_check(20, 3) == 95
+    assert tables.deity("Du’um")["alignment"] == "Unaligned/Evil"
+    with pytest.raises(KeyError):
+        tables.cap("Nobody", 1)
+    for spiritual in (-1, 7):
+        with pytest.raises(ValueError):
+            tables.cap("Homma", spiritual, per_spiritual=3)
+        with pytest.raises(ValueError):
+            tables.worship_check(20, spiritual)
+    with pytest.raises(KeyError):
+        tables.worship_check(30, 1)
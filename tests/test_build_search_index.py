@@ -0,0 +1,59 @@
+from pathlib import Path
+import json
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from tools.build_search_index import DEFAULT_PSIONICS, SearchDocument, SearchIndex, documents_from_psionics, documents_from_store, tokenize
+from tools.parse_races import ParserConfig, RaceParser
+import pytest
+
+DOCUMENTS = [
+    SearchDocument("FEAT_A", "feature", "Shadow Blender", "Move freely in darkness."),
+    SearchDocument("FEAT_B", "ancillary", "Fireborn", "Your attacks deal fire damage in darkness."),
+    SearchDocument("PSI_C", "psionic", "Pry", "Search a target's thoughts."),
+]
+
+
+def test_tokenize_folds_case_apostrophes_and_stopwords():
+    assert tokenize("The Phi’ilin and THEIR darkness") == ["phiilin", "darkness"]
+
+
+def test_search_intersects_postings_and_ranks_titles_first():
+    index = SearchIndex.build(DOCUMENTS)
+    assert [hit["id"] for hit in index.search("darkness")] == ["FEAT_A", "FEAT_B"]
+    assert [hit["id"] for hit in index.search("fire darkness")] == ["FEAT_B"]
+    assert [hit["id"] for hit in index.search("shadow")] == ["FEAT_A"]
+    assert index.search("darkness", kind="ancillary")[0]["id"] == "FEAT_B"
+    assert index.search("unicorn darkness") == []
+
+
+def test_index_round_trips_through_versioned_artifact():
+    index = SearchIndex.build(DOCUMENTS)
+    payload = json.loads(json.dumps(index.to_dict()))
+    assert payload["version"] == 1
+    assert SearchIndex.from_dict(payload).search("thoughts")[0]["id"] == "PSI_C"
+    payload["version"] = 99
+    with pytest.raises(ValueError):
+        SearchIndex.from_dict(payload)
+
+
+def test_indexes_entity_store_descriptions():
+    store, _ = RaceParser(ParserConfig()).parse(Path("docs/sample_race_text.txt").read_text())
+    index = SearchIndex.build(documents_from_store(store))
+    assert any(hit["kind"] == "feature" for hit in index.search("swamplands"))
+
+
+def test_duplicate_ids_are_suffixed_and_reported():
+    index = SearchIndex.build(DOCUMENTS + [SearchDocument("FEAT_A", "feature", "Shadow Step", "Step between shadows.")])
+    assert [document.id for document in index.documents] == ["FEAT_A", "FEAT_B", "PSI_C", "FEAT_A_2"]
+    assert index.search("step")[0]["id"] == "FEAT_A_2"
+    assert len(index.warnings) == 1
+
+
+def test_repeated_psionic_abilities_are_keyed_by_prerequisite():
+    documents = list(documents_from_psionics(DEFAULT_PSIONICS))
+    ids = [document.id for document in documents]
+    assert len(ids) == len(set(ids))
+    assert {"PSI_HYPNOSIS_AURA", "PSI_HYPNOSIS_AURA_FORBID", "PSI_HYPNOSIS_TIMED_INSERTION_ALTER_ILLUSION"} <= set(ids)
+    assert not SearchIndex.build(documents).warnings
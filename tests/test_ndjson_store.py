@@ -0,0 +1,48 @@
+from pathlib import Path
+import json
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from tools.ndjson_store import NdjsonReader, write_ndjson
+from tools.parse_races import ParserConfig, RaceParser, emit_outputs
+from tools.validate_content import load_payload, validate_payload
+import pytest
+
+
+def test_offsets_point_at_exact_records(tmp_path):
+    rows = [
+        {"id": "A", "source_id": "LIN_X", "name": "Ünïcode"},
+        {"id": "B", "source_id": "LIN_Y", "name": "Plain"},
+        {"id": "C", "source_id": "LIN_X", "name": "Third"},
+    ]
+    data_path = write_ndjson(tmp_path, "features.json", rows)
+    raw = data_path.read_bytes()
+    index = json.loads((tmp_path / "features.index.json").read_text(encoding="utf-8"))
+    offset, length = index["ids"]["B"]
+    assert json.loads(raw[offset : offset + length]) == rows[1]
+
+    with NdjsonReader(data_path) as reader:
+        assert reader.get("A")["name"] == "Ünïcode"
+        assert [row["id"] for row in reader.find("source_id", "LIN_X")] == ["A", "C"]
+        assert reader.get("missing") is None
+        assert list(reader) == rows
+
+
+def test_duplicate_ids_are_rejected(tmp_path):
+    with pytest.raises(ValueError, match="Duplicate id 'A'"):
+        write_ndjson(tmp_path, "features.json", [{"id": "A", "name": "First"}, {"id": "A", "name": "Second"}])
+
+
+def test_emit_outputs_ndjson_round_trips_store(tmp_path):
+    store, _ = RaceParser(ParserConfig()).parse(Path("docs/sample_race_text.txt").read_text())
+    emit_outputs(store, tmp_path, output_format="ndjson")
+
+    with NdjsonReader.open(tmp_path, "effects") as reader:
+        assert len(reader) == len(store.effects)
+        feature_id = store.effects[0]["feature_id"]
+        expected = [effect for effect in store.effects if effect["feature_id"] == feature_id]
+        assert reader.find("feature_id", feature_id) == expected
+    with NdjsonReader.open(tmp_path, "deity_caps") as reader:
+        assert len(reader) == 0
+    assert not validate_payload(load_payload(tmp_path)).has_errors()
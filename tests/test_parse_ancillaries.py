@@ -0,0 +1,96 @@
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from tools.parse_ancillaries import (
+    DEFAULT_INPUTS,
+    AncillaryParser,
+    CharacterProfile,
+    PrerequisiteIndex,
+    Requirement,
+    compile_requirement,
+    iter_block_entries,
+)
+from tools.parse_races import ParserConfig
+
+BLOCK_TEXT = """General Ancillaries
+
+Alchemist Apprentice
+Requirements:
++50 Craft
++50 Academic Recall
+
+You can Craft Basic Potions.
+
+Alchemist
+Requirements:
+-Alchemist Apprentice Ancillary
++100 Craft
+
+You can Craft Advanced Potions. You gain +10 Craft.
+"""
+
+
+def test_block_entries_split_names_requirements_and_prose():
+    entries = list(iter_block_entries(BLOCK_TEXT.splitlines()))
+    assert [entry.name for entry in entries] == ["Alchemist Apprentice", "Alchemist"]
+    assert entries[1].requirements == ["-Alchemist Apprentice Ancillary", "+100 Craft"]
+    assert entries[0].description == ["You can Craft Basic Potions."]
+
+
+def test_compile_requirement_handles_conjunctions_and_alternatives():
+    config = ParserConfig()
+    clauses = compile_requirement("+75 Battle and +75 Psionic Technique, Will Dakar, or Divine Intervention", config)
+    assert clauses == [
+        (Requirement("skill_min", "BATTLE", 75),),
+        (
+            Requirement("skill_min", "PSIONIC_TECHNIQUE", 75),
+            Requirement("skill_min", "WILL_DAKAR", 75),
+            Requirement("skill_min", "DIVINE_INTERVENTION", 75),
+        ),
+    ]
+    assert compile_requirement("+50 Worship and Divine Intervention", config)[1] == (
+        Requirement("skill_min", "DIVINE_INTERVENTION", 50),
+    )
+    assert compile_requirement("-Grazin or Thairin Race", config) == [
+        (Requirement("culture", "GRAZIN"), Requirement("culture", "THAIRIN"))
+    ]
+    assert compile_requirement("-Clergy background", config)[0][0].kind == "manual"
+
+
+def test_prerequisite_index_only_returns_satisfied_candidates():
+    parser = AncillaryParser(ParserConfig())
+    for entry in iter_block_entries(BLOCK_TEXT.splitlines()):
+        parser.add_entry(entry)
+    store, report, index = parser.finalize()
+
+    assert all(feature["source_type"] == "ancillary" for feature in store.features.values())
+    assert any(effect["target"].get("code") == "CRAFT" for effect in store.effects)
+
+    novice = CharacterProfile(skills={"CRAFT": 60, "ACADEMIC_RECALL": 50})
+    assert [e.code for e in index.eligible(novice)] == ["ALCHEMIST_APPRENTICE"]
+    skilled = CharacterProfile(ancillaries={"ALCHEMIST_APPRENTICE"}, skills={"CRAFT": 100})
+    assert [e.code for e in index.eligible(skilled)] == ["ALCHEMIST"]
+
+    reloaded = PrerequisiteIndex.from_dict(index.to_dict())
+    assert [e.code for e in reloaded.eligible(skilled)] == ["ALCHEMIST"]
+
+
+def test_parses_repository_ancillary_files():
+    parser = AncillaryParser(ParserConfig())
+    for path in DEFAULT_INPUTS:
+        parser.parse_file(path)
+    store, report, index = parser.finalize()
+
+    assert not report.has_errors()
+    assert not index.dangling_references()
+    assert index.ancillaries["RED_CLOTH_OF_TULURON"].clauses[0] == (Requirement("manual", "leader of new church"),)
+    assert index.ancillaries["SUPERIOR_IMMUNITY"].clauses[1] == (Requirement("skill_min", "ENDURE", 75),)
+    assert not [effect for effect in store.effects if effect["feature_id"] == "FEAT_ANC_STARSEAMSTRESS"]
+    for feature_id in ("FEAT_ANC_FLEDGLING_MARTIAL", "FEAT_ANC_BRUTAL_ILDAKAR", "FEAT_ANC_EPIC_FIREBORN"):
+        assert not [effect for effect in store.effects if effect["feature_id"] == feature_id]
+    assert any(warning.startswith("Ancillary Brutal Ildakar: skipped effect sentence") for warning in report.warnings)
+    assert index.ancillaries["WHALE_CLAN"].clauses[0] == (Requirement("culture", "GRAZIN"),)
+    profile = CharacterProfile(culture="GRAZIN", lineage="ININ")
+    assert "WHALE_CLAN" in {e.code for e in index.eligible(profile)}
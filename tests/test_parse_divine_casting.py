@@ -0,0 +1,85 @@
+from pathlib import Path
+import json
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from tools.build_deity_tables import DEFAULT_INPUT as DEITY_INPUT
+from tools.parse_divine_casting import DEFAULT_INPUT, DivineCastingParser, DivineCastingTables
+from tools.parse_races import store_payload
+from tools.validate_content import validate_payload
+import pytest
+
+
+def parse_default():
+    parser = DivineCastingParser()
+    parser.parse_file(DEFAULT_INPUT)
+    return parser.finalize()
+
+
+def test_deities_match_curated_relationships():
+    store, report, tables = parse_default()
+    curated = json.loads(Path(DEITY_INPUT).read_text(encoding="utf-8"))["deities"]
+
+    assert not report.has_errors() and not report.warnings
+    assert [(row["name"], row["sect"], row["alignment"]) for row in tables.deities] == [
+        (deity["name"], deity["sect"], deity["alignment"]) for deity in curated
+    ]
+    assert [[action["value"] for action in row["worship"]] for row in tables.deities] == [
+        [action["value"] for action in deity["worship"]] for deity in curated
+    ]
+    assert not validate_payload(store_payload(store)).has_errors()
+
+
+def test_features_and_effects_follow_store_model():
+    store, _, _ = parse_default()
+    features = {feature["id"]: feature for feature in store.features.values()}
+    effects = {effect["id"]: effect for effect in store.effects}
+
+    assert features["FEAT_DEITY_HOMMA_TURN_EVIL"]["source_id"] == "DEITY_HOMMA"
+    assert effects["FEAT_DEITY_HOMMA_TURN_EVIL_E01"]["magnitude"] == {
+        "energy_cost": 1,
+        "action_point_cost": 1,
+        "tier_count": 7,
+    }
+    assert effects["FEAT_DEITY_HOMMA_WORSHIP_BRING_ORDER_E01"]["magnitude"] == {"per_spiritual": 4}
+    passive = effects["FEAT_DEITY_NAIBEN_WORSHIP_LAWFUL_PLACE_E01"]
+    assert passive["magnitude"] == {"per_spiritual": 3}
+    assert passive["conditions"] == [{"condition_type": "while", "condition_value": "Lawful Place"}]
+
+
+def test_tables_resolve_rules_without_rereading_text():
+    _, _, parsed = parse_default()
+    tables = DivineCastingTables.from_dict(json.loads(json.dumps(parsed.to_dict())))
+
+    assert tables.worship_check(60, 2) == 130
+    assert tables.worship_gain("Zera", "Treat Injured", 4) == 12
+    assert tables.worship_gain("Naiben", "Lawful Place", 2) == 6
+    rule = tables.intervention("DEITY_HOMMA", "Turn Evil", 7)
+    assert (rule["feature_id"], rule["tier"], rule["energy_cost"], rule["action_point_cost"]) == (
+        "FEAT_DEITY_HOMMA_TURN_EVIL", 7, 1, 1
+    )
+    assert tables.intervention("Fallen Patriarch/Matriarch", "Rot", 1)["deity_id"] == "DEITY_GRALL"
+    assert sorted(tables.spell_index["VALOR"]) == ["DEITY_FLORA", "DEITY_THUL"]
+    assert "FEAT_DEITY_HOMMA_WORSHIP_BRING_ORDER" in tables.worship_by_value["4"]
+    with pytest.raises(ValueError):
+        tables.intervention("Homma", "Turn Evil", 8)
+    with pytest.raises(KeyError):
+        tables.intervention("Homma", "Smite", 1)
+
+
+def test_zero_point_worship_is_not_filed_as_passive():
+    parser = DivineCastingParser()
+    parser.parse_lines(["Light Sect", "Homma", "Worship", "1. Organize (0)", "2. Lawful Place Passive"])
+    _, _, tables = parser.finalize()
+
+    assert tables.worship_by_value["0"] == ["FEAT_DEITY_HOMMA_WORSHIP_ORGANIZE"]
+    assert tables.worship_by_value["passive"] == ["FEAT_DEITY_HOMMA_WORSHIP_LAWFUL_PLACE"]
+
+
+def test_shared_lookups_reject_spiritual_outside_tables():
+    _, _, tables = parse_default()
+    with pytest.raises(ValueError):
+        tables.worship_check(20, -1)
+    with pytest.raises(KeyError):
+        tables.worship_check(30, 1)
@@ -3,7 +3,8 @@ import sys
 
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
-from tools.parse_races import ParserConfig, RaceParser, convert_input_to_text
+from tools.parse_races import EntityStore, ParserConfig, RaceParser, convert_input_to_text, emit_outputs
+import json
 import pytest
 
 
@@ -37,3 +38,60 @@ def test_convert_input_reports_missing_pandoc(monkeypatch, tmp_path):
     monkeypatch.setattr("subprocess.run", fake_run)
     with pytest.raises(SystemExit):
         convert_input_to_text(missing_doc, pandoc_binary="pandoc")
+
+
+def test_store_interns_targets_and_conditions(tmp_path):
+    text = Path("docs/sample_race_text.txt").read_text()
+    store, _ = RaceParser(ParserConfig()).parse(text)
+
+    swamp_conditions = [
+        condition
+        for effect in store.effects
+        for condition in effect["conditions"]
+        if condition["condition_value"] == {"equals": "swampland"}
+    ]
+    assert len(swamp_conditions) > 1
+    assert all(condition is swamp_conditions[0] for condition in swamp_conditions)
+
+    emit_outputs(store, tmp_path, normalize_refs=True)
+    effects = json.loads((tmp_path / "effects.json").read_text())
+    target_ids = {row["id"] for row in json.loads((tmp_path / "targets.json").read_text())}
+    condition_ids = {row["id"] for row in json.loads((tmp_path / "conditions.json").read_text())}
+    assert all(effect["target_id"] in target_ids for effect in effects)
+    assert all(set(effect["condition_ids"]) <= condition_ids for effect in effects)
+    assert "target" not in effects[0] and "conditions" not in effects[0]
+    assert set(store.effect_refs) == {effect["id"] for effect in store.effects}
+
+
+def test_condition_ids_do_not_depend_on_content_order():
+    conditions = [
+        {"condition_type": "lighting", "condition_value": {"equals": "darkness"}},
+        {"condition_type": "while", "condition_value": "wielding a weapon in each hand during a surprise round"},
+    ]
+    forward, backward = EntityStore(), EntityStore()
+    for condition in conditions:
+        forward.intern_condition(condition)
+    for condition in reversed(conditions):
+        backward.intern_condition(condition)
+
+    assert sorted(forward.condition_table(), key=lambda row: row["id"]) == sorted(
+        backward.condition_table(), key=lambda row: row["id"]
+    )
+    assert {row["condition_type"] for row in forward.condition_table()} == {"lighting", "while"}
+    ids = sorted(row["id"] for row in forward.condition_table())
+    assert ids[0] == "COND_LIGHTING_DARKNESS"
+    assert ids[1].startswith("COND_WHILE_WIELDING_A_WEAPON") and len(ids[1]) <= len("COND_") + 40 + 7
+
+
+def test_mapping_file_carries_lineage_tables(tmp_path):
+    mapping = tmp_path / "mapping.json"
+    mapping.write_text(
+        json.dumps({"known_lineages": ["Zorn"], "culture_lineage_map": {"zornish": "Zorn"}}),
+        encoding="utf-8",
+    )
+    config = ParserConfig.from_path(mapping)
+    assert config.known_lineages == ["Zorn"]
+    assert config.culture_lineage_map == {"zornish": "Zorn"}
+
+    mapping.write_text(json.dumps({"skills": {"battle": "BATTLE"}}), encoding="utf-8")
+    assert ParserConfig.from_path(mapping).known_lineages == ParserConfig().known_lineages
@@ -0,0 +1,98 @@
+from pathlib import Path
+import json
+import sys
+import threading
+import urllib.error
+import urllib.request
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from tools.parse_races import ParserConfig
+from tools.parse_service import ParseService, RequestError, make_server
+import pytest
+
+
+def test_service_parses_text_and_counts_requests():
+    service = ParseService(ParserConfig(), workers=2)
+    try:
+        text = Path("docs/sample_race_text.txt").read_text()
+        result = service.handle({"text": text, "normalize_refs": True})
+        assert result["store"]["lineages"][0]["id"] == "LIN_ININ"
+        assert "conditions" in result["store"]
+        with pytest.raises(RequestError):
+            service.handle({})
+        stats = service.stats.snapshot()
+        assert stats["requests"] == 2
+        assert stats["errors"] == 1
+    finally:
+        service.close()
+
+
+def test_service_rejects_paths_outside_input_root(tmp_path):
+    service = ParseService(ParserConfig(), workers=1, input_root=tmp_path)
+    try:
+        with pytest.raises(RequestError):
+            service.handle({"path": str(Path("docs/sample_race_text.txt").resolve())})
+    finally:
+        service.close()
+
+
+def test_relative_paths_resolve_against_input_root():
+    service = ParseService(ParserConfig(), workers=1, input_root=Path("docs"))
+    try:
+        result = service.handle({"path": "sample_race_text.txt"})
+        assert result["store"]["lineages"][0]["id"] == "LIN_ININ"
+        with pytest.raises(RequestError):
+            service.handle({"path": "../data/races.txt"})
+    finally:
+        service.close()
+
+
+def test_service_defaults_input_root_to_working_directory(tmp_path, monkeypatch):
+    outside = tmp_path / "outside.txt"
+    outside.write_text("ININ", encoding="utf-8")
+    monkeypatch.chdir(Path(__file__).resolve().parents[1])
+    service = ParseService(ParserConfig(), workers=1)
+    try:
+        assert service.input_root == Path.cwd().resolve()
+        with pytest.raises(RequestError):
+            service.handle({"path": str(outside)})
+    finally:
+        service.close()
+
+
+def test_http_rejects_oversized_body():
+    service = ParseService(ParserConfig(), workers=1, max_body_bytes=64)
+    server = make_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        body = json.dumps({"text": "x" * 128}).encode("utf-8")
+        request = urllib.request.Request(f"http://127.0.0.1:{server.server_address[1]}/parse", data=body)
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            urllib.request.urlopen(request)
+        assert excinfo.value.code == 413
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close()
+
+
+def test_http_round_trip():
+    service = ParseService(ParserConfig(), workers=2)
+    server = make_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        body = json.dumps({"path": "docs/sample_race_text.txt"}).encode("utf-8")
+        request = urllib.request.Request(f"{base}/parse", data=body, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request) as response:
+            payload = json.load(response)
+        assert any(effect["effect_type"] == "movement_mod" for effect in payload["store"]["effects"])
+        with urllib.request.urlopen(f"{base}/stats") as response:
+            assert json.load(response)["requests"] == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close()
@@ -0,0 +1,69 @@
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from tools.parse_races import ParserConfig, RaceParser, main, store_payload
+from tools.validate_content import validate_payload
+import pytest
+
+
+def _sample_store():
+    store, _ = RaceParser(ParserConfig()).parse(Path("docs/sample_race_text.txt").read_text())
+    return store
+
+
+def test_parser_output_passes_in_both_layouts():
+    store = _sample_store()
+    assert not validate_payload(store_payload(store)).has_errors()
+    assert not validate_payload(store_payload(store, normalize_refs=True)).has_errors()
+
+
+def test_reports_broken_references_duplicates_and_enums():
+    payload = store_payload(_sample_store(), normalize_refs=True)
+    payload["features.json"][0]["source_id"] = "LIN_MISSING"
+    payload["cultures.json"].append(dict(payload["cultures.json"][0]))
+    payload["effects.json"][0]["feature_id"] = "FEAT_MISSING"
+    payload["effects.json"][1]["effect_type"] = "teleport"
+    payload["effects.json"][2]["target_id"] = "TGT_MISSING"
+    payload["conditions.json"][0]["condition_type"] = "weather"
+
+    errors = "\n".join(validate_payload(payload).errors)
+    assert "unknown lineages reference LIN_MISSING" in errors
+    assert "cultures.json: duplicate id" in errors
+    assert "duplicate code" in errors
+    assert "unknown features reference FEAT_MISSING" in errors
+    assert "effect_type 'teleport'" in errors
+    assert "unknown targets reference TGT_MISSING" in errors
+    assert "condition_type 'weather'" in errors
+
+
+def test_provisional_enum_values_warn_and_cap_effects_need_a_table():
+    payload = store_payload(_sample_store())
+    payload["effects.json"][0]["conditions"] = [{"condition_type": "while", "condition_value": "raging"}]
+    payload["effects.json"].append(
+        {
+            "id": "FEAT_X_E01",
+            "feature_id": payload["effects.json"][0]["feature_id"],
+            "effect_type": "deity_relationship_cap",
+            "target": {"type": "deity_relationship_cap"},
+            "magnitude": {"flat": 1},
+            "conditions": [],
+        }
+    )
+
+    report = validate_payload(payload)
+    assert report.errors == ["effects.json FEAT_X_E01: deity_relationship_cap effect has no magnitude.cap_table_id"]
+    assert any("provisional condition_type 'while'" in warning for warning in report.warnings)
+    assert any("provisional effect_type 'deity_relationship_cap'" in warning for warning in report.warnings)
+
+
+def test_check_flag_blocks_output_on_failure(tmp_path, monkeypatch):
+    args = ["--input", "docs/sample_race_text.txt", "--output", str(tmp_path / "ok"), "--check"]
+    main(args)
+    assert (tmp_path / "ok" / "effects.json").exists()
+
+    monkeypatch.setattr("tools.validate_content.EFFECT_TYPES", frozenset())
+    with pytest.raises(SystemExit):
+        main(["--input", "docs/sample_race_text.txt", "--output", str(tmp_path / "bad"), "--check"])
+    assert not (tmp_path / "bad").exists()
@@ -0,0 +1,127 @@
+"""
+Seeded background generator for NPCs and encounters.
+
+Each stage's roll table from ``Backgrounds.txt`` (see ``parse_backgrounds.py``)
+is compiled into a Walker/Vose alias table over packed arrays, so drawing one
+stage costs a single random number and two array reads regardless of how many
+entries the stage has. Entries are weighted by the roll range printed in the
+source; stages without ranges are drawn uniformly.
+
+Backgrounds are reproducible: the same seed and count always produce the same
+list, and a longer run with the same seed extends a shorter one.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from tools.parse_backgrounds import parse_entries, roll_tables, source
+
+STAGE_KEYS = {
+    "Family": "family",
+    "Childhood": "childhood",
+    "Adolescence": "adolescence",
+    "Adulthood": "adulthood",
+    "Flaws": "flaw",
+    "Inciting Incident": "inciting_incident",
+}
+
+
+class AliasTable:
+    """O(1) sampler for a discrete distribution (Vose's alias method)."""
+
+    __slots__ = ("size", "probability", "alias")
+
+    def __init__(self, weights: Sequence[float]) -> None:
+        if not weights or any(weight < 0 for weight in weights) or not sum(weights):
+            raise ValueError("Alias table needs at least one positive weight and no negative weights")
+        self.size = len(weights)
+        total = float(sum(weights))
+        scaled = [weight * self.size / total for weight in weights]
+        self.probability = array("d", [0.0] * self.size)
+        self.alias = array("I", range(self.size))
+        small = [index for index, value in enumerate(scaled) if value < 1.0]
+        large = [index for index, value in enumerate(scaled) if value >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.probability[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+        for index in small + large:
+            self.probability[index] = 1.0
+
+    def sample(self, rng: random.Random) -> int:
+        draw = rng.random() * self.size
+        column = int(draw)
+        return column if draw - column < self.probability[column] else self.alias[column]
+
+
+@dataclass
+class BackgroundSampler:
+    names: Dict[str, List[str]] = field(default_factory=dict)
+    tables: Dict[str, AliasTable] = field(default_factory=dict)
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Dict[str, object]]) -> "BackgroundSampler":
+        sampler = cls()
+        for stage, rows in roll_tables(entries).items():
+            key = STAGE_KEYS.get(stage)
+            if key is None:
+                continue
+            sampler.names[key] = [name for name, _ in rows]
+            sampler.tables[key] = AliasTable([weight for _, weight in rows])
+        return sampler
+
+    @classmethod
+    def from_source(cls, path: Path = source) -> "BackgroundSampler":
+        return cls.from_entries(parse_entries(path.read_text(encoding="utf-8", errors="ignore").splitlines()))
+
+    def sample(self, rng: random.Random) -> Dict[str, str]:
+        return {key: self.names[key][table.sample(rng)] for key, table in self.tables.items()}
+
+    def generate(self, count: int, seed: int) -> List[Dict[str, str]]:
+        rng = random.Random(seed)
+        stages: List[Tuple[str, List[str], AliasTable]] = [
+            (key, self.names[key], table) for key, table in self.tables.items()
+        ]
+        return [{key: names[table.sample(rng)] for key, names, table in stages} for _ in range(count)]
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate seeded, reproducible character backgrounds.")
+    parser.add_argument("--count", type=int, default=1, help="Number of backgrounds to generate (default: 1).")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0).")
+    parser.add_argument("--source", default=str(source), help="Path to Backgrounds.txt.")
+    parser.add_argument("--output", help="Write a JSON array here instead of stdout.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    sampler = BackgroundSampler.from_source(Path(args.source))
+    started = time.perf_counter()
+    backgrounds = sampler.generate(args.count, args.seed)
+    elapsed = time.perf_counter() - started
+
+    if args.output:
+        output_path = Path(args.output)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with output_path.open("w", encoding="utf-8") as handle:
+            json.dump(backgrounds, handle, indent=2)
+    else:
+        json.dump(backgrounds, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    rate = args.count / elapsed if elapsed else float("inf")
+    sys.stderr.write(f"Generated {args.count} backgrounds in {elapsed:.3f}s ({rate:,.0f}/s)\n")
+
+
+if __name__ == "__main__":
+    main()
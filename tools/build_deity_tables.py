@@ -0,0 +1,199 @@
+"""
+Build stage that compiles ``data/deity_relationships.json`` into dense lookup tables.
+
+The output ``deity_tables.json`` holds:
+- ``deities``: one row per deity (sect, alignment, worship actions, divine
+  interventions), addressed by a stable ``DEITY_*`` ID through ``deity_index``.
+- ``cap_tables``: deity relationship caps per racial cap bonus, each a list
+  indexed by Spiritual value. IDs (``DRCAP_P03``) match the ``cap_table_id``
+  that ``tools/parse_races.py`` writes into ``deity_relationship_cap`` effects.
+- ``worship_tiers``: worship check targets keyed by cap percentage, again
+  indexed by Spiritual value.
+
+A character's cap with a deity is then a row lookup plus a list index. Caps
+do not vary by deity in the source data; the deity lookup validates the deity
+and gives its alignment for apostasy checks.
+"""
+import argparse
+import json
+import re
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from tools.parse_races import DEITY_CAP_MAX_SPIRITUAL, deity_cap_table, deity_cap_table_id, human_id
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_INPUT = ROOT / "data" / "deity_relationships.json"
+TABLES_VERSION = 1
+
+
+def deity_id(name: str) -> str:
+    return human_id("DEITY", name)
+
+
+class DeityLookup:
+    """Deity and worship-check lookups shared by the compiled deity tables.
+
+    Subclasses provide ``deities``, ``deity_index`` and ``worship_tiers``
+    (keyed by cap percentage).
+    """
+
+    deities: List[Dict[str, object]]
+    deity_index: Dict[str, int]
+    worship_tiers: Dict[int, Dict[str, object]]
+
+    def deity(self, key: str) -> Dict[str, object]:
+        """Look up a deity by ``DEITY_*`` ID or display name."""
+        position = self.deity_index.get(key)
+        if position is None:
+            position = self.deity_index.get(deity_id(key))
+        if position is None:
+            raise KeyError(f"Unknown deity {key}")
+        return self.deities[position]
+
+    def worship_check(self, cap_percent: int, spiritual: int) -> int:
+        tier = self.worship_tiers.get(cap_percent)
+        if tier is None:
+            raise KeyError(f"No worship tier for {cap_percent}% of the cap")
+        return spiritual_lookup(tier["checks"], spiritual)
+
+    def encoded_worship_tiers(self) -> Dict[str, Dict[str, object]]:
+        return {str(percent): tier for percent, tier in self.worship_tiers.items()}
+
+    @staticmethod
+    def decode_worship_tiers(payload: Dict[str, Dict[str, object]]) -> Dict[int, Dict[str, object]]:
+        return {int(percent): tier for percent, tier in payload.items()}
+
+
+@dataclass
+class DeityTables(DeityLookup):
+    deities: List[Dict[str, object]] = field(default_factory=list)
+    deity_index: Dict[str, int] = field(default_factory=dict)
+    cap_tables: Dict[str, Dict[str, object]] = field(default_factory=dict)
+    worship_tiers: Dict[int, Dict[str, object]] = field(default_factory=dict)  # cap_percent -> tier row
+
+    def cap(self, deity: str, spiritual: int, per_spiritual: int = 0) -> int:
+        self.deity(deity)
+        table = self.cap_tables.get(deity_cap_table_id(per_spiritual))
+        if table is None:
+            raise KeyError(f"No cap table for racial cap bonus {per_spiritual}")
+        return spiritual_lookup(table["caps"], spiritual)
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "version": TABLES_VERSION,
+            "deities": self.deities,
+            "deity_index": {row["id"]: position for position, row in enumerate(self.deities)},
+            "cap_tables": self.cap_tables,
+            "worship_tiers": self.encoded_worship_tiers(),
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, object]) -> "DeityTables":
+        if payload.get("version") != TABLES_VERSION:
+            raise ValueError(f"Unsupported deity tables version {payload.get('version')}")
+        return cls(
+            deities=list(payload["deities"]),
+            deity_index=dict(payload["deity_index"]),
+            cap_tables=dict(payload["cap_tables"]),
+            worship_tiers=cls.decode_worship_tiers(payload["worship_tiers"]),
+        )
+
+
+def spiritual_lookup(values: Sequence[int], spiritual: int) -> int:
+    """Index a per-Spiritual table, rejecting values outside it (no negative indexing)."""
+    if not 0 <= spiritual < len(values):
+        raise ValueError(f"Spiritual must be between 0 and {len(values) - 1}, got {spiritual}")
+    return values[spiritual]
+
+
+def worship_tier(cap_percent: int, base: int, per_spiritual: int, max_spiritual: int = DEITY_CAP_MAX_SPIRITUAL) -> Dict[str, object]:
+    """Worship check targets for one share of the cap, indexed by Spiritual value."""
+    return {
+        "cap_percent": cap_percent,
+        "base": base,
+        "per_spiritual": per_spiritual,
+        "checks": [base + per_spiritual * spiritual for spiritual in range(0, max_spiritual + 1)],
+    }
+
+
+def _parse_tier_formula(formula: str) -> Optional[tuple]:
+    match = re.match(r"\s*(\d+)\s*\+\s*\(\s*(\d+)\s*\*\s*Spiritual", formula, flags=re.IGNORECASE)
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+def build_tables(
+    payload: Dict[str, object],
+    *,
+    extra_bonuses: Iterable[int] = (),
+    max_spiritual: int = DEITY_CAP_MAX_SPIRITUAL,
+) -> DeityTables:
+    tables = DeityTables()
+    for deity in payload.get("deities", []):
+        row = {
+            "id": deity_id(deity["name"]),
+            "name": deity["name"],
+            "sect": deity.get("sect"),
+            "alignment": deity.get("alignment"),
+            "worship": deity.get("worship", []),
+            "divine_interventions": deity.get("divineInterventions", []),
+        }
+        tables.deity_index[row["id"]] = len(tables.deities)
+        tables.deities.append(row)
+
+    currency = payload.get("currency", {})
+    bonuses = sorted({0, *currency.get("racialCapBonusOptions", []), *extra_bonuses})
+    for bonus in bonuses:
+        table = deity_cap_table(bonus, max_spiritual)
+        tables.cap_tables[table["id"]] = table
+
+    for percent, formula in sorted(currency.get("capTiers", {}).items(), key=lambda item: int(item[0])):
+        parsed = _parse_tier_formula(formula)
+        if parsed is None:
+            raise ValueError(f"Unrecognised cap tier formula: {formula}")
+        base, per_spiritual = parsed
+        tables.worship_tiers[int(percent)] = worship_tier(int(percent), base, per_spiritual, max_spiritual)
+    return tables
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compile deity relationships into dense lookup tables.")
+    parser.add_argument("--input", dest="input_path", default=str(DEFAULT_INPUT), help="Path to deity_relationships.json.")
+    parser.add_argument("--output", dest="output_dir", required=True, help="Directory to write deity_tables.json.")
+    parser.add_argument(
+        "--caps",
+        dest="caps_path",
+        help="Optional deity_caps.json from parse_races.py; its racial bonuses are added to the cap tables.",
+    )
+    parser.add_argument(
+        "--max-spiritual",
+        type=int,
+        default=DEITY_CAP_MAX_SPIRITUAL,
+        help=f"Highest Spiritual value to tabulate (default: {DEITY_CAP_MAX_SPIRITUAL}).",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    with Path(args.input_path).open("r", encoding="utf-8") as handle:
+        payload = json.load(handle)
+    extra_bonuses: List[int] = []
+    if args.caps_path:
+        with Path(args.caps_path).open("r", encoding="utf-8") as handle:
+            extra_bonuses = [row["per_spiritual"] for row in json.load(handle)]
+    tables = build_tables(payload, extra_bonuses=extra_bonuses, max_spiritual=args.max_spiritual)
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with (output_dir / "deity_tables.json").open("w", encoding="utf-8") as handle:
+        json.dump(tables.to_dict(), handle, indent=2)
+    print(f"Wrote {len(tables.deities)} deities and {len(tables.cap_tables)} cap tables to {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
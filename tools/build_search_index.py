@@ -0,0 +1,240 @@
+"""
+Build stage that emits a full-text search index over parsed content.
+
+Descriptions are collected from the ``EntityStore`` features, lineages and
+cultures produced by ``parse_races.py``, the ancillary features from
+``parse_ancillaries.py``, ``data/psionics.csv`` and ``Backgrounds.txt``. They
+are tokenised into an inverted index: each term maps to a posting list of
+``(document, term frequency)`` pairs sorted by document. Postings are stored
+delta-encoded in ``search-index.json`` next to the content pack.
+
+A query intersects the posting lists of its terms, starting from the rarest,
+and ranks matches by TF-IDF with a boost for terms in the title. Clients no
+longer need to scan every description.
+"""
+import argparse
+import csv
+import hashlib
+import json
+import math
+import re
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from tools.parse_ancillaries import DEFAULT_INPUTS as ANCILLARY_INPUTS, AncillaryParser
+from tools.parse_backgrounds import parse_entries, source as BACKGROUNDS_SOURCE
+from tools.parse_races import EntityStore, ParserConfig, RaceParser, convert_input_to_text, human_id
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_RACES = ROOT / "data" / "races.txt"
+DEFAULT_PSIONICS = ROOT / "data" / "psionics.csv"
+SEARCH_INDEX_VERSION = 1
+TITLE_BOOST = 3
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have if in into is it its of on or that the their them they this to "
+    "was were when which while with you your".split()
+)
+
+
+class SearchDocument(NamedTuple):
+    id: str
+    kind: str
+    title: str
+    text: str
+
+
+def tokenize(text: str) -> List[str]:
+    folded = re.sub(r"['’]", "", text.lower())
+    return [token for token in re.findall(r"[a-z0-9]+", folded) if token not in STOPWORDS]
+
+
+def documents_from_store(store: EntityStore) -> Iterator[SearchDocument]:
+    for lineage in store.lineages.values():
+        yield SearchDocument(lineage["id"], "lineage", lineage["name"], lineage.get("description", ""))
+    for culture in store.cultures.values():
+        yield SearchDocument(culture["id"], "culture", culture["name"], culture.get("description", ""))
+    for feature in store.features.values():
+        kind = "ancillary" if feature["source_type"] == "ancillary" else "feature"
+        yield SearchDocument(feature["id"], kind, feature["name"], feature.get("description", ""))
+
+
+def documents_from_psionics(path: Path) -> Iterator[SearchDocument]:
+    # The same ability name can appear more than once in a tree under different
+    # prerequisites (e.g. Hypnosis "Aura"); those copies are keyed by prerequisite.
+    seen: Set[str] = set()
+    with path.open("r", encoding="utf-8", newline="") as handle:
+        for row in csv.DictReader(handle):
+            tree, ability = row["Ability Tree"].strip(), row["Ability"].strip()
+            if not ability:
+                continue
+            doc_id = human_id("PSI", f"{tree}_{ability}")
+            if doc_id in seen:
+                doc_id = human_id("PSI", f"{tree}_{ability}_{row.get('Prerequisite', '').strip()}")
+            seen.add(doc_id)
+            yield SearchDocument(doc_id, "psionic", ability, row.get("Description", ""))
+
+
+def documents_from_backgrounds(entries: Iterable[Dict[str, object]]) -> Iterator[SearchDocument]:
+    for entry in entries:
+        yield SearchDocument(human_id("BG", f"{entry['stage']}_{entry['name']}"), "background", entry["name"], entry["details"])
+
+
+@dataclass
+class SearchIndex:
+    documents: List[SearchDocument] = field(default_factory=list)
+    postings: Dict[str, List[int]] = field(default_factory=dict)  # term -> [doc_delta, tf, doc_delta, tf, ...]
+    warnings: List[str] = field(default_factory=list)
+
+    @classmethod
+    def build(cls, documents: Iterable[SearchDocument]) -> "SearchIndex":
+        index = cls()
+        seen: Dict[str, int] = {}
+        raw: Dict[str, Dict[int, int]] = {}
+        for document in documents:
+            if document.id in seen:
+                doc_id, suffix = document.id, 2
+                while f"{doc_id}_{suffix}" in seen:
+                    suffix += 1
+                document = document._replace(id=f"{doc_id}_{suffix}")
+                index.warnings.append(f"Duplicate search document id {doc_id} ({document.kind} {document.title!r}); indexed as {document.id}")
+            seen[document.id] = position = len(index.documents)
+            index.documents.append(document)
+            counts: Dict[str, int] = {}
+            for token in tokenize(document.text):
+                counts[token] = counts.get(token, 0) + 1
+            for token in tokenize(document.title):
+                counts[token] = counts.get(token, 0) + TITLE_BOOST
+            for token, count in counts.items():
+                raw.setdefault(token, {})[position] = count
+        for term in sorted(raw):
+            encoded: List[int] = []
+            previous = 0
+            for position, count in sorted(raw[term].items()):
+                encoded.extend((position - previous, count))
+                previous = position
+            index.postings[term] = encoded
+        return index
+
+    def posting_list(self, term: str) -> Dict[int, int]:
+        encoded = self.postings.get(term, [])
+        decoded: Dict[int, int] = {}
+        position = 0
+        for offset in range(0, len(encoded), 2):
+            position += encoded[offset]
+            decoded[position] = encoded[offset + 1]
+        return decoded
+
+    def search(self, query: str, *, kind: Optional[str] = None, limit: int = 20) -> List[Dict[str, object]]:
+        terms = sorted(set(tokenize(query)), key=lambda term: len(self.postings.get(term, ())))
+        if not terms:
+            return []
+        total = len(self.documents)
+        scores: Optional[Dict[int, float]] = None
+        for term in terms:
+            postings = self.posting_list(term)
+            if not postings:
+                return []
+            idf = math.log(1 + total / len(postings))
+            if scores is None:
+                scores = {position: count * idf for position, count in postings.items()}
+            else:
+                scores = {position: score + postings[position] * idf for position, score in scores.items() if position in postings}
+            if not scores:
+                return []
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        results: List[Dict[str, object]] = []
+        for position, score in ranked:
+            document = self.documents[position]
+            if kind and document.kind != kind:
+                continue
+            results.append({"id": document.id, "kind": document.kind, "title": document.title, "score": round(score, 4)})
+            if len(results) >= limit:
+                break
+        return results
+
+    def to_dict(self) -> Dict[str, object]:
+        documents = [[document.id, document.kind, document.title] for document in self.documents]
+        digest = hashlib.sha256(json.dumps([documents, self.postings], sort_keys=True).encode("utf-8")).hexdigest()
+        return {
+            "version": SEARCH_INDEX_VERSION,
+            "digest": digest[:16],
+            "title_boost": TITLE_BOOST,
+            "documents": documents,
+            "postings": self.postings,
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, object]) -> "SearchIndex":
+        if payload.get("version") != SEARCH_INDEX_VERSION:
+            raise ValueError(f"Unsupported search index version {payload.get('version')}")
+        return cls(
+            documents=[SearchDocument(doc_id, kind, title, "") for doc_id, kind, title in payload["documents"]],
+            postings=dict(payload["postings"]),
+        )
+
+
+def collect_documents(
+    *,
+    races_path: Optional[Path],
+    ancillary_paths: Sequence[Path],
+    psionics_path: Optional[Path],
+    backgrounds_path: Optional[Path],
+    config: ParserConfig,
+) -> Iterator[SearchDocument]:
+    if races_path:
+        store, _ = RaceParser(config).parse(convert_input_to_text(races_path, config.pandoc_binary))
+        yield from documents_from_store(store)
+    if ancillary_paths:
+        parser = AncillaryParser(config)
+        for path in ancillary_paths:
+            parser.parse_file(path)
+        yield from documents_from_store(parser.store)
+    if psionics_path:
+        yield from documents_from_psionics(psionics_path)
+    if backgrounds_path:
+        lines = backgrounds_path.read_text(encoding="utf-8", errors="ignore").splitlines()
+        yield from documents_from_backgrounds(parse_entries(lines))
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build a full-text search index over parsed content descriptions.")
+    parser.add_argument("--output", dest="output_dir", required=True, help="Directory to write search-index.json.")
+    parser.add_argument("--races", default=str(DEFAULT_RACES), help="Race and Skills text (or DOC) to index.")
+    parser.add_argument("--ancillaries", action="append", help="Ancillary text file (repeatable; defaults to data/).")
+    parser.add_argument("--psionics", default=str(DEFAULT_PSIONICS), help="Psionics CSV to index.")
+    parser.add_argument("--backgrounds", default=str(BACKGROUNDS_SOURCE), help="Backgrounds.txt to index.")
+    parser.add_argument("--mapping", dest="mapping", help="Optional JSON mapping file for aliases and pandoc path.")
+    parser.add_argument("--query", help="Run a query against the built index and print the results.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    config = ParserConfig.from_path(Path(args.mapping)) if args.mapping else ParserConfig()
+    index = SearchIndex.build(
+        collect_documents(
+            races_path=Path(args.races) if args.races else None,
+            ancillary_paths=[Path(item) for item in args.ancillaries] if args.ancillaries else ANCILLARY_INPUTS,
+            psionics_path=Path(args.psionics) if args.psionics else None,
+            backgrounds_path=Path(args.backgrounds) if args.backgrounds else None,
+            config=config,
+        )
+    )
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with (output_dir / "search-index.json").open("w", encoding="utf-8") as handle:
+        json.dump(index.to_dict(), handle, separators=(",", ":"))
+    for warning in index.warnings:
+        print(f"Warning: {warning}")
+    print(f"Indexed {len(index.documents)} documents and {len(index.postings)} terms into {output_dir}")
+    if args.query:
+        print(json.dumps(index.search(args.query), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Newline-delimited JSON output with a byte-offset index for random access.
+
+``write_ndjson`` writes one compact JSON record per line to ``<name>.ndjson``
+and a sidecar ``<name>.index.json`` mapping each record ID to its
+``[offset, length]`` in bytes, plus secondary keys (``source_id``,
+``feature_id``) mapping a value to the IDs of the records that carry it.
+
+``NdjsonReader`` memory-maps the data file and decodes only the requested
+records. A consumer needing one lineage's features no longer loads the whole
+file.
+"""
+import json
+import mmap
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+NDJSON_INDEX_VERSION = 1
+SECONDARY_KEYS = ("source_id", "feature_id")
+
+
+def write_ndjson(
+    output_dir: Path, name: str, rows: Iterable[Dict[str, object]], *, secondary_keys: Sequence[str] = SECONDARY_KEYS
+) -> Path:
+    """Write ``rows`` as ``<stem>.ndjson`` plus ``<stem>.index.json``; returns the data path.
+
+    Raises ``ValueError`` on a repeated ``id`` rather than indexing only the last copy.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    stem = name.removesuffix(".json")
+    data_path = output_dir / f"{stem}.ndjson"
+    ids: Dict[str, List[int]] = {}
+    secondary: Dict[str, Dict[str, List[str]]] = {key: {} for key in secondary_keys}
+    offset = 0
+    with data_path.open("wb") as handle:
+        for row in rows:
+            encoded = json.dumps(row, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            handle.write(encoded + b"\n")
+            row_id = row.get("id")
+            if row_id is not None:
+                if row_id in ids:
+                    raise ValueError(f"Duplicate id {row_id!r} in {data_path.name}")
+                ids[row_id] = [offset, len(encoded)]
+                for key in secondary_keys:
+                    value = row.get(key)
+                    if value is not None:
+                        secondary[key].setdefault(value, []).append(row_id)
+            offset += len(encoded) + 1
+    index = {
+        "version": NDJSON_INDEX_VERSION,
+        "ids": ids,
+        "by": {key: values for key, values in secondary.items() if values},
+    }
+    with (output_dir / f"{stem}.index.json").open("w", encoding="utf-8") as handle:
+        json.dump(index, handle, separators=(",", ":"))
+    return data_path
+
+
+class NdjsonReader:
+    """Random-access reader over an ``.ndjson`` file and its offset index."""
+
+    def __init__(self, data_path: Path) -> None:
+        self.data_path = Path(data_path)
+        index_path = self.data_path.with_name(self.data_path.name.removesuffix(".ndjson") + ".index.json")
+        with index_path.open("r", encoding="utf-8") as handle:
+            index = json.load(handle)
+        if index.get("version") != NDJSON_INDEX_VERSION:
+            raise ValueError(f"Unsupported NDJSON index version {index.get('version')}")
+        self.ids: Dict[str, List[int]] = index["ids"]
+        self.secondary: Dict[str, Dict[str, List[str]]] = index.get("by", {})
+        self._handle = self.data_path.open("rb")
+        size = self.data_path.stat().st_size
+        self._data = mmap.mmap(self._handle.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    @classmethod
+    def open(cls, output_dir: Path, name: str) -> "NdjsonReader":
+        return cls(Path(output_dir) / f"{name.removesuffix('.json')}.ndjson")
+
+    def __enter__(self) -> "NdjsonReader":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, record_id: str) -> bool:
+        return record_id in self.ids
+
+    def get(self, record_id: str) -> Optional[Dict[str, object]]:
+        location = self.ids.get(record_id)
+        if location is None:
+            return None
+        offset, length = location
+        return json.loads(self._data[offset : offset + length])
+
+    def find(self, key: str, value: str) -> List[Dict[str, object]]:
+        """Records whose secondary ``key`` (e.g. ``source_id``) equals ``value``."""
+        return [self.get(record_id) for record_id in self.secondary.get(key, {}).get(value, [])]
+
+    def __iter__(self) -> Iterator[Dict[str, object]]:
+        for record_id in self.ids:
+            yield self.get(record_id)
+
+    def close(self) -> None:
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._handle.close()
@@ -0,0 +1,427 @@
+"""
+Parser for the ancillary text files in ``data/``.
+
+``general_ancillaries.txt`` and ``mechanical_ancillaries.txt`` hold blocks of
+a name line, a ``Requirements:`` list of prerequisite ancillaries and
+skill/attribute minimums, then prose. ``ancestry_ancillaries.txt`` groups
+``Name: description`` lines under lineage/culture headings. Entries are read
+line by line and emitted as ``EntityStore`` features and effects with
+``source_type="ancillary"``.
+
+Requirements are compiled into a ``PrerequisiteIndex``. Each ancillary is
+filed under one key clause (an owned ancillary, a lineage/culture, or a sorted
+skill/attribute threshold), so finding the ancillaries a character qualifies
+for only visits candidates reachable from what the character already has.
+Requirements the parser cannot check (backgrounds, organizations, unlocked
+abilities) are kept as ``manual`` clauses and returned as pending.
+"""
+import argparse
+import json
+import re
+import sys
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from tools.parse_races import EntityStore, ParserConfig, RaceParser, ValidationReport, emit_outputs, slugify
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_INPUTS = [
+    ROOT / "data" / "general_ancillaries.txt",
+    ROOT / "data" / "mechanical_ancillaries.txt",
+    ROOT / "data" / "ancestry_ancillaries.txt",
+]
+
+# Requirement lines that spell an ancillary differently from its heading.
+ANCILLARY_ALIASES = {
+    "APPRENTICE_ENCHANTER": "ENCHANTER_APPRENTICE",
+    "HELLOCK": "HELL_LOCK",
+    "HEXLOCK": "HEX_LOCK",
+}
+
+REQUIREMENTS_LINE = re.compile(r"requirements:\s*(.*)$", flags=re.IGNORECASE)
+# Signed numbers the race effect classifier would misread as permanent bonuses:
+# AP/energy costs, spell requirements, "x Attribute" multipliers.
+UNPLACEABLE_SENTENCE = re.compile(
+    r"[+-]\d+\s*(?:AP|action points?)\b|\b\d+\s+energy\b|\brequir|\bin exchange for\b|\bcosts?\b|[+-]\d+\s*x\s",
+    flags=re.IGNORECASE,
+)
+# Options listed after a choice menu only apply to the chosen branch.
+CHOICE_MENU = re.compile(r"\bchoose\b|\bone of the following\b", flags=re.IGNORECASE)
+
+KEY_KINDS = ("ancillary", "lineage", "culture")
+STAT_KINDS = ("skill_min", "attribute_min")
+
+
+class Requirement(NamedTuple):
+    kind: str  # ancillary | lineage | culture | skill_min | attribute_min | manual
+    code: str
+    minimum: Optional[int] = None
+
+
+# A clause is satisfied when any of its requirements is; an ancillary needs every clause.
+Clause = Tuple[Requirement, ...]
+
+
+@dataclass
+class AncillaryEntry:
+    name: str
+    source_file: str
+    requirements: List[str] = field(default_factory=list)
+    description: List[str] = field(default_factory=list)
+    origin: Optional[Requirement] = None
+
+    @property
+    def code(self) -> str:
+        return ancillary_code(self.name)
+
+
+@dataclass
+class CharacterProfile:
+    ancillaries: Set[str] = field(default_factory=set)
+    skills: Dict[str, int] = field(default_factory=dict)
+    attributes: Dict[str, int] = field(default_factory=dict)
+    lineage: Optional[str] = None
+    culture: Optional[str] = None
+
+
+@dataclass
+class Eligibility:
+    code: str
+    name: str
+    pending: List[str] = field(default_factory=list)
+
+
+def ancillary_code(name: str) -> str:
+    return slugify(re.sub(r"\s*\[.*?\]", "", name))
+
+
+def _clean(line: str) -> str:
+    return line.replace("\ufeff", "").strip()
+
+
+def iter_block_entries(lines: Iterable[str], source_file: str = "") -> Iterator[AncillaryEntry]:
+    """Yield ``Name / Requirements: / prose`` blocks with one line of lookahead."""
+    current: Optional[AncillaryEntry] = None
+    held: Optional[str] = None  # last prose line; becomes the next name if "Requirements:" follows
+    in_requirements = False
+    for raw in lines:
+        line = _clean(raw)
+        requirements = REQUIREMENTS_LINE.match(line)
+        if requirements:
+            if current:
+                yield current
+            current = AncillaryEntry(name=held or "", source_file=source_file)
+            if requirements.group(1):
+                # "Requirements: leader of new church" -- free text, compiled as a manual clause.
+                current.requirements.append(requirements.group(1))
+            held = None
+            in_requirements = True
+            continue
+        if not line:
+            in_requirements = False
+            continue
+        if in_requirements and line[0] in "+-":
+            current.requirements.append(line)
+            continue
+        if held is not None and current is not None:
+            current.description.append(held)
+        held = line
+    if current:
+        if held is not None:
+            current.description.append(held)
+        yield current
+
+
+def iter_ancestry_entries(
+    lines: Iterable[str], config: ParserConfig, source_file: str = ""
+) -> Iterator[AncillaryEntry]:
+    """Yield ``Name: description`` lines grouped under lineage/culture headings."""
+    origin: Optional[Requirement] = None
+    for raw in lines:
+        line = _clean(raw)
+        if not line:
+            continue
+        if ":" not in line:
+            origin = resolve_origin(line.split()[0], config)
+            continue
+        if origin is None:
+            continue
+        name, description = line.split(":", 1)
+        description = re.sub(r"\s*\[Mechanical\]\s*$", "", description.strip())
+        yield AncillaryEntry(name=name.strip(), source_file=source_file, description=[description], origin=origin)
+
+
+def iter_ancillary_file(path: Path, config: ParserConfig) -> Iterator[AncillaryEntry]:
+    with path.open("r", encoding="utf-8") as handle:
+        first = _clean(handle.readline())
+        if first.lower().startswith("ancestry"):
+            yield from iter_ancestry_entries(handle, config, path.name)
+        else:
+            yield from iter_block_entries(handle, path.name)
+
+
+def resolve_origin(name: str, config: ParserConfig) -> Optional[Requirement]:
+    code = slugify(name)
+    for culture, lineage in config.culture_lineage_map.items():
+        if slugify(culture) == code:
+            return Requirement("culture", code)
+    if any(slugify(lineage) == code for lineage in config.known_lineages):
+        return Requirement("lineage", code)
+    return None
+
+
+def resolve_stat(name: str, config: ParserConfig) -> Optional[Requirement]:
+    lowered = name.strip().lower()
+    if lowered in config.attribute_aliases:
+        return Requirement("attribute_min", config.attribute_aliases[lowered])
+    if lowered in config.skill_aliases:
+        return Requirement("skill_min", config.skill_aliases[lowered])
+    return None
+
+
+def compile_requirement(line: str, config: ParserConfig) -> List[Clause]:
+    """Compile one requirement line into all-of clauses of any-of requirements."""
+    text = line.strip().rstrip(".").strip()
+    manual = [(Requirement("manual", text.lstrip("-+ ").strip()),)]
+    lowered = text.lower()
+    if text.startswith("-") and not re.match(r"-\d", text):
+        body = text[1:].strip()
+        ancillary = re.fullmatch(r"(.+?)\s+ancillary", body, flags=re.IGNORECASE)
+        if ancillary and not re.search(r"\b(background|race|ancestral)\b", lowered):
+            names = re.split(r"\s+or\s+", ancillary.group(1))
+            codes = [ancillary_code(name) for name in names]
+            return [tuple(Requirement("ancillary", ANCILLARY_ALIASES.get(code, code)) for code in codes)]
+        race = re.fullmatch(r"(.+?)\s+race", body, flags=re.IGNORECASE)
+        if race:
+            origins = [resolve_origin(name, config) for name in re.split(r",?\s+or\s+|,\s*", race.group(1))]
+            if origins and all(origins):
+                return [tuple(origins)]
+        return manual
+    if not text.startswith("+") or re.search(r"\b(both|in one)\b", lowered):
+        return manual
+
+    clauses: List[Clause] = []
+    minimum: Optional[int] = None
+    for part in re.split(r",?\s+and\s+", text):
+        alternatives: List[Requirement] = []
+        for alternative in re.split(r",\s*(?:or\s+)?|\s+or\s+", part):
+            alternative = alternative.strip()
+            if not alternative:
+                continue
+            bonus = re.match(r"\+(\d+)\s+(.*)$", alternative)
+            if bonus:
+                minimum = int(bonus.group(1))
+                alternative = bonus.group(2)
+            stat = resolve_stat(alternative, config)
+            if stat is None or minimum is None:
+                return manual
+            alternatives.append(stat._replace(minimum=minimum))
+        clauses.append(tuple(alternatives))
+    return clauses
+
+
+def requirement_met(requirement: Requirement, profile: CharacterProfile) -> bool:
+    kind, code, minimum = requirement
+    if kind == "ancillary":
+        return code in profile.ancillaries
+    if kind == "lineage":
+        return profile.lineage == code
+    if kind == "culture":
+        return profile.culture == code
+    if kind == "skill_min":
+        return profile.skills.get(code, 0) >= minimum
+    if kind == "attribute_min":
+        return profile.attributes.get(code, 0) >= minimum
+    return False
+
+
+@dataclass
+class CompiledAncillary:
+    code: str
+    name: str
+    feature_id: str
+    clauses: List[Clause] = field(default_factory=list)
+
+
+class PrerequisiteIndex:
+    def __init__(self) -> None:
+        self.ancillaries: Dict[str, CompiledAncillary] = {}
+        self.by_key: Dict[Tuple[str, str], List[str]] = {}
+        self.thresholds: Dict[Tuple[str, str], List[Tuple[int, str]]] = {}
+        self.unconditional: List[str] = []
+
+    def add(self, compiled: CompiledAncillary) -> None:
+        self.ancillaries[compiled.code] = compiled
+        key_clause = next((c for c in compiled.clauses if all(r.kind in KEY_KINDS for r in c)), None)
+        if key_clause:
+            for requirement in key_clause:
+                self.by_key.setdefault((requirement.kind, requirement.code), []).append(compiled.code)
+            return
+        stat_clause = next((c for c in compiled.clauses if all(r.kind in STAT_KINDS for r in c)), None)
+        if stat_clause:
+            for requirement in stat_clause:
+                bucket = self.thresholds.setdefault((requirement.kind, requirement.code), [])
+                bucket.append((requirement.minimum, compiled.code))
+                bucket.sort()
+            return
+        self.unconditional.append(compiled.code)
+
+    def candidates(self, profile: CharacterProfile) -> Set[str]:
+        """Ancillaries whose key clause the profile already satisfies."""
+        found: Set[str] = set(self.unconditional)
+        keys = [("ancillary", code) for code in profile.ancillaries]
+        keys += [("lineage", profile.lineage), ("culture", profile.culture)]
+        for key in keys:
+            found.update(self.by_key.get(key, ()))
+        for kind, values in (("skill_min", profile.skills), ("attribute_min", profile.attributes)):
+            for code, value in values.items():
+                bucket = self.thresholds.get((kind, code))
+                if bucket:
+                    found.update(anc for _, anc in bucket[: bisect_right(bucket, (value, "\uffff"))])
+        return found - profile.ancillaries
+
+    def eligible(self, profile: CharacterProfile) -> List[Eligibility]:
+        results: List[Eligibility] = []
+        for code in sorted(self.candidates(profile)):
+            compiled = self.ancillaries[code]
+            pending: List[str] = []
+            for clause in compiled.clauses:
+                if any(requirement_met(requirement, profile) for requirement in clause):
+                    continue
+                manual = [requirement.code for requirement in clause if requirement.kind == "manual"]
+                if not manual:
+                    break
+                pending.extend(manual)
+            else:
+                results.append(Eligibility(code=code, name=compiled.name, pending=pending))
+        return results
+
+    def dangling_references(self) -> List[Tuple[str, str]]:
+        """(ancillary, missing prerequisite) pairs for prerequisites that were never parsed."""
+        return [
+            (code, requirement.code)
+            for code, compiled in self.ancillaries.items()
+            for clause in compiled.clauses
+            for requirement in clause
+            if requirement.kind == "ancillary" and requirement.code not in self.ancillaries
+        ]
+
+    def to_dict(self) -> Dict[str, object]:
+        def encode(requirement: Requirement) -> Dict[str, object]:
+            payload: Dict[str, object] = {"kind": requirement.kind, "code": requirement.code}
+            if requirement.minimum is not None:
+                payload["min"] = requirement.minimum
+            return payload
+
+        return {
+            "version": 1,
+            "ancillaries": {
+                code: {
+                    "name": compiled.name,
+                    "feature_id": compiled.feature_id,
+                    "clauses": [[encode(requirement) for requirement in clause] for clause in compiled.clauses],
+                }
+                for code, compiled in self.ancillaries.items()
+            },
+            "by_key": {f"{kind}:{code}": codes for (kind, code), codes in self.by_key.items()},
+            "thresholds": {f"{kind}:{code}": [list(row) for row in rows] for (kind, code), rows in self.thresholds.items()},
+            "unconditional": self.unconditional,
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, object]) -> "PrerequisiteIndex":
+        index = cls()
+        for code, row in payload["ancillaries"].items():
+            clauses = [
+                tuple(Requirement(item["kind"], item["code"], item.get("min")) for item in clause)
+                for clause in row["clauses"]
+            ]
+            index.ancillaries[code] = CompiledAncillary(code, row["name"], row["feature_id"], clauses)
+        for key, codes in payload["by_key"].items():
+            index.by_key[tuple(key.split(":", 1))] = list(codes)
+        for key, rows in payload["thresholds"].items():
+            index.thresholds[tuple(key.split(":", 1))] = [(minimum, code) for minimum, code in rows]
+        index.unconditional = list(payload["unconditional"])
+        return index
+
+
+class AncillaryParser:
+    def __init__(self, config: ParserConfig) -> None:
+        self.config = config
+        self.race_parser = RaceParser(config)
+        self.store: EntityStore = self.race_parser.store
+        self.report: ValidationReport = self.race_parser.report
+        self.index = PrerequisiteIndex()
+
+    def parse_file(self, path: Path) -> None:
+        for entry in iter_ancillary_file(path, self.config):
+            self.add_entry(entry)
+
+    def finalize(self) -> Tuple[EntityStore, ValidationReport, PrerequisiteIndex]:
+        for code, missing in self.index.dangling_references():
+            self.report.warnings.append(f"Ancillary {code} requires unknown ancillary {missing}")
+        return self.store, self.report, self.index
+
+    def add_entry(self, entry: AncillaryEntry) -> Optional[str]:
+        code = entry.code
+        if not entry.name or not code:
+            self.report.add_unparsed_line(" ".join(entry.requirements + entry.description))
+            return None
+        if code in self.index.ancillaries:
+            self.report.warnings.append(f"Duplicate ancillary {entry.name} in {entry.source_file}")
+            return None
+        description = "\n".join(entry.description)
+        feature_id = self.store.add_feature(
+            source_type="ancillary",
+            source_id=f"ANC_{code}",
+            name=re.sub(r"\s*\[.*?\]", "", entry.name),
+            category=self.config.default_category,
+            description=description,
+        )
+        in_choice = False
+        for sentence in re.split(r"(?<=\.)\s+", " ".join(entry.description)):
+            in_choice = in_choice or bool(CHOICE_MENU.search(sentence))
+            if not re.search(r"[+-]\d", sentence):
+                continue
+            if in_choice or UNPLACEABLE_SENTENCE.search(sentence):
+                self.report.warnings.append(f"Ancillary {entry.name}: skipped effect sentence: {sentence}")
+                continue
+            self.race_parser.add_effects_from_text(sentence, feature_id)
+        clauses: List[Clause] = [(entry.origin,)] if entry.origin else []
+        for line in entry.requirements:
+            clauses.extend(compile_requirement(line, self.config))
+        self.index.add(CompiledAncillary(code=code, name=entry.name, feature_id=feature_id, clauses=clauses))
+        return feature_id
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Parse ancillary text files into features, effects and a prerequisite index.")
+    parser.add_argument("--input", dest="inputs", action="append", help="Ancillary text file (repeatable; defaults to the files in data/).")
+    parser.add_argument("--output", dest="output_dir", required=True, help="Directory to write JSON files.")
+    parser.add_argument("--mapping", dest="mapping", help="Optional JSON mapping file for aliases.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    config = ParserConfig.from_path(Path(args.mapping)) if args.mapping else ParserConfig()
+    parser = AncillaryParser(config)
+    for path in [Path(item) for item in args.inputs] if args.inputs else DEFAULT_INPUTS:
+        parser.parse_file(path)
+    store, report, index = parser.finalize()
+
+    print("Validation report:")
+    print(report.summarize())
+    output_dir = Path(args.output_dir)
+    emit_outputs(store, output_dir)
+    with (output_dir / "ancillary_prerequisites.json").open("w", encoding="utf-8") as handle:
+        json.dump(index.to_dict(), handle, indent=2)
+    print(f"Wrote {len(index.ancillaries)} ancillaries to {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import csv
 import re
 from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
 
 ROOT = Path(__file__).resolve().parents[1]
 source = ROOT / "Backgrounds.txt"
@@ -23,63 +24,112 @@ stage_headers = {
 
 stop_markers = {"starting wealth"}
 
-lines = source.read_text(encoding="utf-8", errors="ignore").splitlines()
-
-entries = []
-current_stage = None
-current_entry = None
-
-
-def flush_entry():
-    global current_entry
-    if current_entry:
-        current_entry["details"] = current_entry["details"].strip()
-        entries.append(current_entry)
-    current_entry = None
-
-
-for raw_line in lines:
-    line = raw_line.strip()
-    lower = line.lower()
-    if not line:
-        continue
+PERCENTILE_SIDES = 100
+ROLL_RANGE = re.compile(r"^(\d{1,3})\s*(?:[-–]\s*(\d{1,3}))?\s*[.:)]?\s+")
+
+
+def parse_entries(lines: Iterable[str]) -> List[Dict[str, object]]:
+    entries: List[Dict[str, object]] = []
+    current_stage: Optional[str] = None
+    current_entry: Optional[Dict[str, object]] = None
+
+    def flush_entry() -> None:
+        nonlocal current_entry
+        if current_entry:
+            current_entry["details"] = current_entry["details"].strip()
+            entries.append(current_entry)
+        current_entry = None
+
+    for raw_line in lines:
+        line = raw_line.strip()
+        lower = line.lower()
+        if not line:
+            continue
+
+        if lower in stop_markers:
+            flush_entry()
+            break
+
+        if lower in stage_headers:
+            flush_entry()
+            current_stage = stage_headers[lower]
+            continue
+
+        if current_stage and line.startswith("*"):
+            flush_entry()
+            content = line.lstrip("* ")
+            roll_range = ROLL_RANGE.match(content)
+            if roll_range:
+                content = content[roll_range.end():]
+            if ":" in content:
+                name, desc = content.split(":", 1)
+            else:
+                name, desc = content, ""
+            current_entry = {
+                "stage": current_stage,
+                "name": name.strip(),
+                "details": desc.strip(),
+                "roll_min": int(roll_range.group(1)) if roll_range else None,
+                "roll_max": int(roll_range.group(2) or roll_range.group(1)) if roll_range else None,
+            }
+            continue
+
+        if current_entry:
+            # combine wrapped lines into details
+            if current_entry["details"]:
+                current_entry["details"] += " " + line
+            else:
+                current_entry["details"] = line
+
+    flush_entry()
+    check_roll_ranges(entries)
+    return entries
+
+
+def check_roll_ranges(entries: List[Dict[str, object]]) -> None:
+    """Stages that give roll ranges must give one per entry, covering 1-100 exactly once."""
+    by_stage: Dict[str, List[Dict[str, object]]] = {}
+    for entry in entries:
+        by_stage.setdefault(entry["stage"], []).append(entry)
+    for stage, stage_entries in by_stage.items():
+        ranged = [entry for entry in stage_entries if entry["roll_min"] is not None]
+        if not ranged:
+            continue
+        if len(ranged) != len(stage_entries):
+            raise ValueError(f"{stage}: some entries have roll ranges and some do not")
+        expected = 1
+        for entry in sorted(ranged, key=lambda item: item["roll_min"]):
+            if entry["roll_min"] != expected or entry["roll_max"] < entry["roll_min"]:
+                raise ValueError(f"{stage}: roll ranges must cover 1-{PERCENTILE_SIDES} without gaps or overlaps")
+            expected = entry["roll_max"] + 1
+        if expected != PERCENTILE_SIDES + 1:
+            raise ValueError(f"{stage}: roll ranges must cover 1-{PERCENTILE_SIDES} without gaps or overlaps")
+
+
+def roll_tables(entries: Iterable[Dict[str, object]]) -> Dict[str, List[Tuple[str, int]]]:
+    """Map each stage to ``(name, weight)`` rows; weights are the width of the roll range, or 1 without one."""
+    tables: Dict[str, List[Tuple[str, int]]] = {}
+    for entry in entries:
+        if entry["roll_min"] is None:
+            weight = 1
+        else:
+            weight = entry["roll_max"] - entry["roll_min"] + 1
+        tables.setdefault(entry["stage"], []).append((entry["name"], weight))
+    return tables
 
-    if lower in stop_markers:
-        flush_entry()
-        break
 
-    if lower in stage_headers:
-        flush_entry()
-        current_stage = stage_headers[lower]
-        continue
+def main() -> None:
+    lines = source.read_text(encoding="utf-8", errors="ignore").splitlines()
+    entries = parse_entries(lines)
 
-    if current_stage and line.startswith("*"):
-        flush_entry()
-        content = line.lstrip("* ")
-        if ":" in content:
-            name, desc = content.split(":", 1)
-        else:
-            name, desc = content, ""
-        current_entry = {
-            "stage": current_stage,
-            "name": name.strip(),
-            "details": desc.strip(),
-        }
-        continue
-
-    if current_entry:
-        # combine wrapped lines into details
-        if current_entry["details"]:
-            current_entry["details"] += " " + line
-        else:
-            current_entry["details"] = line
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with output.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["stage", "name", "details", "roll_min", "roll_max"])
+        writer.writeheader()
+        writer.writerows(entries)
 
-flush_entry()
+    print(f"Wrote {len(entries)} entries to {output}")
 
-output.parent.mkdir(parents=True, exist_ok=True)
-with output.open("w", newline="", encoding="utf-8") as f:
-    writer = csv.DictWriter(f, fieldnames=["stage", "name", "details"])
-    writer.writeheader()
-    writer.writerows(entries)
 
-print(f"Wrote {len(entries)} entries to {output}")
+if __name__ == "__main__":
+    main()
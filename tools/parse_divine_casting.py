@@ -0,0 +1,396 @@
+"""
+Parser for ``data/Divine Casting.txt``.
+
+The file opens with prose rules for worship and divine intervention, then
+lists deities under sect headings. Each deity has a numbered ``Worship`` list
+(``1. Organize (1)`` or ``1. Lawful Place Passive``) and a ``Divine
+Intervention`` list of ``* Spell: effect`` lines. Lines are read one at a
+time and emitted as ``EntityStore`` features and effects with
+``source_type="deity"``:
+- worship actions become ``resource_bonus`` effects on deity relationship,
+  per Spiritual Attribute (passives apply while their condition holds);
+- spells become ``divine_intervention`` effects carrying the casting cost and
+  tier count.
+
+The numbers in the prose (worship check targets, the passive multiplier, the
+casting cost and the seven intervention tiers) are read into
+``DivineCastingTables`` together with per-deity, per-spell and per-worship-
+value indexes, so combat resolution looks a rule up instead of re-reading the
+text.
+"""
+import argparse
+import json
+import re
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from tools.build_deity_tables import DeityLookup, deity_id, worship_tier
+from tools.parse_races import EntityStore, ValidationReport, emit_outputs, slugify
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_INPUT = ROOT / "data" / "Divine Casting.txt"
+TABLES_VERSION = 1
+UNALIGNED = "Unaligned/Evil"
+DEITY_RELATIONSHIP_TARGET = {"type": "resource", "code": "DEITY_RELATIONSHIP"}
+
+NUMBER_WORDS = {"one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10}
+
+SECT_HEADING = re.compile(r"(?P<sect>.+?) Sect|(?P<unaligned>Unaligned)(?:/Evil)?")
+WORSHIP_LINE = re.compile(r"\d+\.\s*(?P<name>.+?)\s+(?:\((?P<value>\d+)\)|(?P<passive>Passive))")
+CHOICE_LINE = re.compile(r"Choose (\w+) Divine Interventions? from (\w+) of the following:?", flags=re.IGNORECASE)
+
+
+class WorshipAction(NamedTuple):
+    name: str
+    value: Optional[int]  # None for passives
+
+    @property
+    def kind(self) -> str:
+        return "passive" if self.value is None else "active"
+
+
+class Intervention(NamedTuple):
+    spell: str
+    effect: str
+
+
+@dataclass
+class InterventionChoice:
+    per_deity: int
+    deities: int
+    options: List[str] = field(default_factory=list)
+
+
+@dataclass
+class DeityEntry:
+    name: str
+    sect: Optional[str] = None
+    alignment: Optional[str] = None
+    worship: List[WorshipAction] = field(default_factory=list)
+    interventions: List[Intervention] = field(default_factory=list)
+    choice: Optional[InterventionChoice] = None
+
+
+@dataclass
+class CastingRules:
+    worship_checks: List[Tuple[int, int]] = field(default_factory=list)  # (cap_percent, base target)
+    check_step: Optional[int] = None
+    passive_multiplier: Optional[int] = None
+    energy_cost: Optional[int] = None
+    action_point_cost: Optional[int] = None
+    tier_count: Optional[int] = None
+    aligned_sects: List[str] = field(default_factory=list)
+
+
+def _clean(line: str) -> str:
+    return line.replace("\ufeff", "").strip()
+
+
+def _number(token: str) -> Optional[int]:
+    return int(token) if token.isdigit() else NUMBER_WORDS.get(token.lower())
+
+
+def casting_rules(text: str, report: ValidationReport) -> CastingRules:
+    """Read the numeric rules out of the introductory prose."""
+    rules = CastingRules()
+    rules.worship_checks = [
+        (int(percent), int(base))
+        for base, percent in re.findall(r"(\d+) for up to (\d+)% of your Deity Relationship Cap", text)
+    ]
+    step = re.search(r"increasing by (\d+) per", text)
+    passive = re.search(r"Passives generate (\d+)x", text)
+    cost = re.search(r"energy nor action point intensive, costing (\d+) each", text)
+    tiers = re.search(r"Each spell has (\w+) divine interventions", text)
+    aligned = re.search(r"Aligned is composed of (.+?)\.", text)
+    rules.check_step = int(step.group(1)) if step else None
+    rules.passive_multiplier = int(passive.group(1)) if passive else None
+    if cost:
+        rules.energy_cost = rules.action_point_cost = int(cost.group(1))
+    rules.tier_count = _number(tiers.group(1)) if tiers else None
+    if aligned:
+        rules.aligned_sects = [
+            re.sub(r"^(?:and|the)\s+|\s+Sect$", "", part.strip()) for part in re.split(r",\s*", aligned.group(1))
+        ]
+    for name in ("worship_checks", "check_step", "passive_multiplier", "energy_cost", "tier_count", "aligned_sects"):
+        if getattr(rules, name) in (None, []):
+            report.warnings.append(f"Divine casting rule not found in prose: {name}")
+    return rules
+
+
+def iter_deity_entries(lines: Iterable[str], prose: Optional[List[str]] = None) -> Iterator[DeityEntry]:
+    """Yield one entry per deity; lines before the first sect heading go to ``prose``."""
+    sect: Optional[str] = None
+    alignment: Optional[str] = None
+    current: Optional[DeityEntry] = None
+    section: Optional[str] = None  # "worship" | "interventions"
+    held: Optional[str] = None  # last unclaimed line; becomes the deity name if "Worship" follows
+    for raw in lines:
+        line = _clean(raw)
+        if not line:
+            continue
+        lowered = line.lower()
+        if lowered == "worship":
+            if current:
+                yield current
+            current = DeityEntry(name=held or "", sect=sect, alignment=alignment)
+            held = None
+            section = "worship"
+            continue
+        if lowered == "divine intervention" and current:
+            section = "interventions"
+            continue
+        heading = SECT_HEADING.fullmatch(line)
+        if heading:
+            sect = "Unaligned" if heading.group("unaligned") else heading.group("sect")
+            alignment = UNALIGNED if heading.group("unaligned") else None
+            section = held = None
+            continue
+        if section == "worship":
+            worship = WORSHIP_LINE.fullmatch(line)
+            if worship:
+                value = worship.group("value")
+                current.worship.append(WorshipAction(worship.group("name"), int(value) if value else None))
+                continue
+        elif section == "interventions":
+            choice = CHOICE_LINE.fullmatch(line)
+            if choice:
+                current.choice = InterventionChoice(per_deity=_number(choice.group(1)), deities=_number(choice.group(2)))
+                continue
+            if line.startswith("*"):
+                spell, _, effect = line.lstrip("* ").partition(":")
+                if current.choice and not effect:
+                    current.choice.options.append(spell.strip())
+                else:
+                    current.interventions.append(Intervention(spell.strip(), effect.strip()))
+                continue
+        if sect is None:
+            if prose is not None:
+                prose.append(line)
+            continue
+        section = None
+        held = line
+    if current:
+        yield current
+
+
+@dataclass
+class DivineCastingTables(DeityLookup):
+    casting_cost: Dict[str, Optional[int]] = field(default_factory=dict)
+    tier_count: Optional[int] = None
+    passive_multiplier: Optional[int] = None
+    worship_tiers: Dict[int, Dict[str, object]] = field(default_factory=dict)  # cap_percent -> tier row
+    deities: List[Dict[str, object]] = field(default_factory=list)
+    deity_index: Dict[str, int] = field(default_factory=dict)
+    intervention_index: Dict[str, Dict[str, object]] = field(default_factory=dict)  # "DEITY_X:SPELL" -> row
+    spell_index: Dict[str, List[str]] = field(default_factory=dict)  # spell code -> deity IDs
+    worship_by_value: Dict[str, List[str]] = field(default_factory=dict)  # "1".."4" | "passive" -> feature IDs
+
+    def intervention(self, deity: str, spell: str, tier: int) -> Dict[str, object]:
+        """The rule for beseeching ``deity`` with ``spell`` at intervention ``tier`` (1-based)."""
+        row = self.intervention_index.get(f"{self.deity(deity)['id']}:{slugify(spell)}")
+        if row is None:
+            raise KeyError(f"{deity} has no divine intervention {spell}")
+        if not self.tier_count or not 1 <= tier <= self.tier_count:
+            raise ValueError(f"Intervention tier must be between 1 and {self.tier_count}")
+        return {**row, "tier": tier, **self.casting_cost}
+
+    def worship_gain(self, deity: str, action: str, spiritual: int) -> int:
+        code = slugify(action)
+        for row in self.deity(deity)["worship"]:
+            if row["code"] == code:
+                per_spiritual = self.passive_multiplier if row["value"] is None else row["value"]
+                return per_spiritual * spiritual
+        raise KeyError(f"{deity} has no worship action {action}")
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "version": TABLES_VERSION,
+            "casting_cost": self.casting_cost,
+            "tier_count": self.tier_count,
+            "passive_multiplier": self.passive_multiplier,
+            "worship_tiers": self.encoded_worship_tiers(),
+            "deities": self.deities,
+            "deity_index": {row["id"]: position for position, row in enumerate(self.deities)},
+            "intervention_index": self.intervention_index,
+            "spell_index": self.spell_index,
+            "worship_by_value": self.worship_by_value,
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, object]) -> "DivineCastingTables":
+        if payload.get("version") != TABLES_VERSION:
+            raise ValueError(f"Unsupported divine casting tables version {payload.get('version')}")
+        return cls(
+            casting_cost=dict(payload["casting_cost"]),
+            tier_count=payload["tier_count"],
+            passive_multiplier=payload["passive_multiplier"],
+            worship_tiers=cls.decode_worship_tiers(payload["worship_tiers"]),
+            deities=list(payload["deities"]),
+            deity_index=dict(payload["deity_index"]),
+            intervention_index=dict(payload["intervention_index"]),
+            spell_index=dict(payload["spell_index"]),
+            worship_by_value=dict(payload["worship_by_value"]),
+        )
+
+
+class DivineCastingParser:
+    def __init__(self) -> None:
+        self.store = EntityStore()
+        self.report = ValidationReport()
+        self.rules: Optional[CastingRules] = None
+        self.tables = DivineCastingTables()
+
+    def parse_file(self, path: Path) -> None:
+        with path.open("r", encoding="utf-8") as handle:
+            self.parse_lines(handle)
+
+    def parse_lines(self, lines: Iterable[str]) -> None:
+        prose: List[str] = []
+        for entry in iter_deity_entries(lines, prose):
+            if self.rules is None:
+                self.set_rules(casting_rules(" ".join(prose), self.report))
+            self.add_entry(entry)
+
+    def set_rules(self, rules: CastingRules) -> None:
+        self.rules = rules
+        self.tables.casting_cost = {"energy_cost": rules.energy_cost, "action_point_cost": rules.action_point_cost}
+        self.tables.tier_count = rules.tier_count
+        self.tables.passive_multiplier = rules.passive_multiplier
+        self.tables.worship_tiers = {
+            percent: worship_tier(percent, base, rules.check_step or 0) for percent, base in rules.worship_checks
+        }
+
+    def finalize(self) -> Tuple[EntityStore, ValidationReport, DivineCastingTables]:
+        for row in self.tables.deities:
+            choice = row["intervention_choice"]
+            if not choice:
+                continue
+            for option in choice["options"]:
+                if option not in self.tables.deity_index:
+                    self.report.warnings.append(f"{row['name']} offers interventions from unknown deity {option}")
+                    continue
+                for spell in self.tables.deity(option)["interventions"]:
+                    source = self.tables.intervention_index[f"{option}:{spell['code']}"]
+                    self.tables.intervention_index.setdefault(f"{row['id']}:{spell['code']}", source)
+        return self.store, self.report, self.tables
+
+    def add_entry(self, entry: DeityEntry) -> Optional[str]:
+        if not entry.name:
+            self.report.add_unparsed_line(" ".join(action.name for action in entry.worship))
+            return None
+        deity = deity_id(entry.name)
+        if deity in self.tables.deity_index:
+            self.report.warnings.append(f"Duplicate deity {entry.name}")
+            return None
+        rules = self.rules or CastingRules()
+        row: Dict[str, object] = {
+            "id": deity,
+            "name": entry.name,
+            "sect": entry.sect,
+            "alignment": entry.alignment or ("Aligned" if entry.sect in rules.aligned_sects else UNALIGNED),
+            "worship": [],
+            "interventions": [],
+            "intervention_choice": None,
+        }
+
+        for action in entry.worship:
+            feature_id = self.store.add_feature(
+                source_type="deity", source_id=deity, name=f"Worship: {action.name}", category="resource"
+            )
+            if action.value is None:
+                self.store.add_effect(
+                    feature_id=feature_id,
+                    effect_type="resource_bonus",
+                    target=DEITY_RELATIONSHIP_TARGET,
+                    magnitude={"per_spiritual": rules.passive_multiplier},
+                    conditions=[{"condition_type": "while", "condition_value": action.name}],
+                )
+            else:
+                self.store.add_effect(
+                    feature_id=feature_id,
+                    effect_type="resource_bonus",
+                    target=DEITY_RELATIONSHIP_TARGET,
+                    magnitude={"per_spiritual": action.value},
+                    applies_automatically=False,
+                )
+            row["worship"].append(
+                {"feature_id": feature_id, "code": slugify(action.name), "name": action.name, "value": action.value, "type": action.kind}
+            )
+            value_key = "passive" if action.value is None else str(action.value)
+            self.tables.worship_by_value.setdefault(value_key, []).append(feature_id)
+
+        for intervention in entry.interventions:
+            code = slugify(intervention.spell)
+            feature_id = self.store.add_feature(
+                source_type="deity",
+                source_id=deity,
+                name=intervention.spell,
+                category="action_economy",
+                description=intervention.effect,
+            )
+            self.store.add_effect(
+                feature_id=feature_id,
+                effect_type="divine_intervention",
+                target={"type": "divine_intervention", "code": code},
+                magnitude={
+                    "energy_cost": rules.energy_cost,
+                    "action_point_cost": rules.action_point_cost,
+                    "tier_count": rules.tier_count,
+                },
+                applies_automatically=False,
+            )
+            spell_row = {"feature_id": feature_id, "deity_id": deity, "code": code, "spell": intervention.spell, "effect": intervention.effect}
+            row["interventions"].append(spell_row)
+            self.tables.intervention_index[f"{deity}:{code}"] = spell_row
+            self.tables.spell_index.setdefault(code, []).append(deity)
+
+        if entry.choice:
+            self.store.add_feature(
+                source_type="deity",
+                source_id=deity,
+                name="Divine Intervention Choice",
+                category="rule_override",
+                description=(
+                    f"Choose {entry.choice.per_deity} Divine Intervention from {entry.choice.deities} of: "
+                    + ", ".join(entry.choice.options)
+                ),
+            )
+            row["intervention_choice"] = {
+                "per_deity": entry.choice.per_deity,
+                "deities": entry.choice.deities,
+                "options": [deity_id(option) for option in entry.choice.options],
+            }
+
+        self.tables.deity_index[deity] = len(self.tables.deities)
+        self.tables.deities.append(row)
+        return deity
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Parse Divine Casting.txt into features, effects and lookup tables.")
+    parser.add_argument("--input", dest="input_path", default=str(DEFAULT_INPUT), help="Path to Divine Casting.txt.")
+    parser.add_argument("--output", dest="output_dir", required=True, help="Directory to write JSON files.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    parser = DivineCastingParser()
+    parser.parse_file(Path(args.input_path))
+    store, report, tables = parser.finalize()
+
+    print("Validation report:")
+    print(report.summarize())
+    output_dir = Path(args.output_dir)
+    emit_outputs(store, output_dir)
+    with (output_dir / "divine_casting.json").open("w", encoding="utf-8") as handle:
+        json.dump(tables.to_dict(), handle, indent=2)
+    print(f"Wrote {len(tables.deities)} deities and {len(tables.intervention_index)} interventions to {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
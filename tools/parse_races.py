@@ -7,6 +7,7 @@ atomic effects into JSON files aligned with the schema proposed in
 by ``pandoc`` and will emit a validation report for unparsed or ambiguous lines.
 """
 import argparse
+import hashlib
 import json
 import re
 import shutil
@@ -14,7 +15,16 @@ import subprocess
 import sys
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+try:
+    from tools.ndjson_store import write_ndjson
+    from tools.validate_content import validate_payload
+except ImportError:  # executed as ``python tools/parse_races.py``
+    from ndjson_store import write_ndjson
+    from validate_content import validate_payload
+
+OUTPUT_FORMATS = ("json", "ndjson")
 
 
 def slugify(text: str) -> str:
@@ -27,6 +37,34 @@ def human_id(prefix: str, code: str, *, suffix: str | None = None) -> str:
     return f"{base}_{slugify(suffix)}" if suffix else base
 
 
+# Condition IDs keep at most this many characters of the slugged value, then a digest.
+CONDITION_CODE_LIMIT = 40
+
+DEITY_CAP_BASE_STEP = 10
+DEITY_CAP_MAX_SPIRITUAL = 6
+
+
+def deity_cap_table_id(per_spiritual: int) -> str:
+    sign = "M" if per_spiritual < 0 else "P"
+    return human_id("DRCAP", f"{sign}{abs(per_spiritual):02d}")
+
+
+def deity_cap_table(per_spiritual: int, max_spiritual: int = DEITY_CAP_MAX_SPIRITUAL) -> Dict[str, object]:
+    """Deity relationship caps indexed by Spiritual value for one racial cap bonus."""
+    step = DEITY_CAP_BASE_STEP + per_spiritual
+    return {
+        "id": deity_cap_table_id(per_spiritual),
+        "per_spiritual": per_spiritual,
+        "cap_step": step,
+        "caps": [step * spiritual for spiritual in range(0, max_spiritual + 1)],
+    }
+
+
+def canonical_key(payload: object) -> str:
+    """Stable key for structurally identical JSON payloads."""
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"))
+
+
 @dataclass
 class ParserConfig:
     pandoc_binary: str = "pandoc"
@@ -137,6 +175,7 @@ class ParserConfig:
             return cls()
         with mapping_path.open("r", encoding="utf-8") as handle:
             payload = json.load(handle)
+        defaults = cls()
         return cls(
             pandoc_binary=payload.get("pandoc_binary", "pandoc"),
             attribute_aliases=payload.get("attributes", {}),
@@ -144,6 +183,8 @@ class ParserConfig:
             language_aliases=payload.get("languages", {}),
             size_aliases=payload.get("sizes", {}),
             default_category=payload.get("default_category", "trait"),
+            known_lineages=payload.get("known_lineages", defaults.known_lineages),
+            culture_lineage_map=payload.get("culture_lineage_map", defaults.culture_lineage_map),
         )
 
 
@@ -159,15 +200,15 @@ class ValidationReport:
     def add_unparsed_effect(self, text: str) -> None:
         self.unparsed_effects.append(text)
 
+    def to_dict(self) -> Dict[str, List[str]]:
+        return {
+            "unparsed_lines": self.unparsed_lines,
+            "unparsed_effects": self.unparsed_effects,
+            "warnings": self.warnings,
+        }
+
     def summarize(self) -> str:
-        return json.dumps(
-            {
-                "unparsed_lines": self.unparsed_lines,
-                "unparsed_effects": self.unparsed_effects,
-                "warnings": self.warnings,
-            },
-            indent=2,
-        )
+        return json.dumps(self.to_dict(), indent=2)
 
     def has_errors(self) -> bool:
         return bool(self.unparsed_lines or self.unparsed_effects)
@@ -185,6 +226,14 @@ class EntityStore:
     effect_counters: Dict[str, int] = field(default_factory=dict)
     lineage_codes: Dict[str, str] = field(default_factory=dict)
     culture_codes: Dict[str, str] = field(default_factory=dict)
+    targets: Dict[str, Dict[str, object]] = field(default_factory=dict)
+    target_ids: Dict[str, str] = field(default_factory=dict)
+    conditions: Dict[str, Dict[str, object]] = field(default_factory=dict)
+    condition_ids: Dict[str, str] = field(default_factory=dict)
+    taken_target_ids: Set[str] = field(default_factory=set)
+    taken_condition_ids: Set[str] = field(default_factory=set)
+    effect_refs: Dict[str, Tuple[str, List[str]]] = field(default_factory=dict)  # effect ID -> (target ID, condition IDs)
+    deity_caps: Dict[str, Dict[str, object]] = field(default_factory=dict)
 
     def ensure_attribute(self, name: str, description: str = "") -> str:
         code = slugify(name)
@@ -281,23 +330,91 @@ class EntityStore:
         conditions: Optional[List[Dict[str, object]]] = None,
     ) -> None:
         effect_id = self._next_effect_id(feature_id)
+        interned_target, target_id = self._intern_target(target)
+        interned_conditions = [self._intern_condition(condition) for condition in conditions or []]
+        self.effect_refs[effect_id] = (target_id, [condition_id for _, condition_id in interned_conditions])
         self.effects.append(
             {
                 "id": effect_id,
                 "feature_id": feature_id,
                 "effect_type": effect_type,
-                "target": target,
+                "target": interned_target,
                 "magnitude": magnitude,
                 "applies_automatically": applies_automatically,
-                "conditions": conditions or [],
+                "conditions": [condition for condition, _ in interned_conditions],
             }
         )
 
+    def intern_target(self, target: Dict[str, str]) -> Dict[str, str]:
+        return self._intern_target(target)[0]
+
+    def intern_condition(self, condition: Dict[str, object]) -> Dict[str, object]:
+        return self._intern_condition(condition)[0]
+
+    def _intern_target(self, target: Dict[str, str]) -> Tuple[Dict[str, str], str]:
+        key = canonical_key(target)
+        if key not in self.targets:
+            parts = [str(target.get(part)) for part in ("type", "code", "mode") if target.get(part)]
+            target_id = human_id("TGT", "_".join(parts) or "NONE")
+            taken = self.taken_target_ids
+            if target_id in taken:
+                target_id = next(f"{target_id}_{n}" for n in range(2, len(taken) + 2) if f"{target_id}_{n}" not in taken)
+            self.targets[key] = target
+            self.target_ids[key] = target_id
+            taken.add(target_id)
+        return self.targets[key], self.target_ids[key]
+
+    def _intern_condition(self, condition: Dict[str, object]) -> Tuple[Dict[str, object], str]:
+        key = canonical_key(condition)
+        if key not in self.conditions:
+            value = condition.get("condition_value")
+            if isinstance(value, dict):
+                value = "_".join(str(item) for item in value.values())
+            code = slugify(f"{condition.get('condition_type')}_{value}")
+            digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:6].upper()
+            if len(code) > CONDITION_CODE_LIMIT:
+                code = f"{code[:CONDITION_CODE_LIMIT].rstrip('_')}_{digest}"
+            condition_id = human_id("COND", code)
+            if condition_id in self.taken_condition_ids:
+                condition_id = human_id("COND", f"{code}_{digest}")
+            self.conditions[key] = condition
+            self.condition_ids[key] = condition_id
+            self.taken_condition_ids.add(condition_id)
+        return self.conditions[key], self.condition_ids[key]
+
+    def ensure_deity_cap_table(self, per_spiritual: int) -> str:
+        table_id = deity_cap_table_id(per_spiritual)
+        if table_id not in self.deity_caps:
+            self.deity_caps[table_id] = deity_cap_table(per_spiritual)
+        return table_id
+
+    def target_table(self) -> List[Dict[str, object]]:
+        return [{"id": self.target_ids[key], "target_ref": target} for key, target in self.targets.items()]
+
+    def condition_table(self) -> List[Dict[str, object]]:
+        return [{"id": self.condition_ids[key], **condition} for key, condition in self.conditions.items()]
+
+    def normalized_effects(self) -> Iterable[Dict[str, object]]:
+        """Yield effects with targets and conditions replaced by the table IDs recorded in ``add_effect``."""
+        for effect in self.effects:
+            target_id, condition_ids = self.effect_refs[effect["id"]]
+            yield {
+                "id": effect["id"],
+                "feature_id": effect["feature_id"],
+                "effect_type": effect["effect_type"],
+                "target_id": target_id,
+                "magnitude": effect["magnitude"],
+                "applies_automatically": effect["applies_automatically"],
+                "condition_ids": list(condition_ids),
+            }
+
     def _source_code(self, source_type: str, source_id: str) -> str:
         if source_type == "lineage":
             return self.lineage_codes.get(source_id, slugify(source_id))
         if source_type == "culture":
             return self.culture_codes.get(source_id, slugify(source_id))
+        if source_type == "ancillary":
+            return "ANC"
         return slugify(source_id)
 
     def _next_effect_id(self, feature_id: str) -> str:
@@ -525,12 +642,19 @@ class RaceParser:
                 return key
         return None
 
+    def add_effects_from_text(self, text: str, feature_id: str) -> None:
+        """Classify free-standing effect text (e.g. from sibling content parsers) onto ``feature_id``."""
+        self._parse_effect_fragments(text, feature_id)
+
     def _parse_effect_fragments(self, text: str, feature_id: str) -> None:
         fragments = self._split_fragments(text)
         for frag in fragments:
             effect_type, target = self._classify_target(frag)
             magnitude = self._extract_magnitude(frag, effect_type)
             conditions = self._extract_conditions(frag)
+            if effect_type == "deity_relationship_cap" and not magnitude:
+                self.report.add_unparsed_effect(frag)
+                continue
             if not effect_type or not magnitude:
                 self.report.warnings.append(f"Skipped effect: {frag}")
                 continue
@@ -583,16 +707,16 @@ class RaceParser:
 
     def _extract_magnitude(self, text: str, effect_type: Optional[str]) -> Optional[Dict[str, object]]:
         if effect_type == "deity_relationship_cap":
-            cap_bonus = re.search(r"([+-]?\d+)\s*/\s*spiritual", text, flags=re.IGNORECASE)
-            if cap_bonus:
-                bonus_value = int(cap_bonus.group(1))
-                step = 10 + bonus_value
-                progression = {str(i): step * i for i in range(0, 7)}
-                return {
-                    "cap_progression": progression,
-                    "cap_step": step,
-                    "per_spiritual": bonus_value,
-                }
+            # "+2/Spiritual Modifier ..." or "+1 spiritual mod ..."; anything else has no cap table.
+            cap_bonus = re.search(r"([+-]?\d+)\s*(?:/\s*spiritual|\s+spiritual\s+mod)", text, flags=re.IGNORECASE)
+            if not cap_bonus:
+                return None
+            bonus_value = int(cap_bonus.group(1))
+            return {
+                "cap_table_id": self.store.ensure_deity_cap_table(bonus_value),
+                "cap_step": DEITY_CAP_BASE_STEP + bonus_value,
+                "per_spiritual": bonus_value,
+            }
         percent = re.search(r"([+-]?\d+)%", text)
         if percent:
             return {"percent": int(percent.group(1))}
@@ -686,14 +810,36 @@ def write_json(output_dir: Path, name: str, payload: Iterable[object]) -> None:
         json.dump(list(payload), handle, indent=2)
 
 
-def emit_outputs(store: EntityStore, output_dir: Path) -> None:
-    write_json(output_dir, "attributes.json", store.attributes.values())
-    write_json(output_dir, "skills.json", store.skills.values())
-    write_json(output_dir, "languages.json", store.languages.values())
-    write_json(output_dir, "lineages.json", store.lineages.values())
-    write_json(output_dir, "cultures.json", store.cultures.values())
-    write_json(output_dir, "features.json", store.features.values())
-    write_json(output_dir, "effects.json", store.effects)
+def store_payload(store: EntityStore, *, normalize_refs: bool = False) -> Dict[str, List[object]]:
+    """Map each output file name to the rows it holds."""
+    payload: Dict[str, List[object]] = {
+        "attributes.json": list(store.attributes.values()),
+        "skills.json": list(store.skills.values()),
+        "languages.json": list(store.languages.values()),
+        "lineages.json": list(store.lineages.values()),
+        "cultures.json": list(store.cultures.values()),
+        "features.json": list(store.features.values()),
+        "deity_caps.json": list(store.deity_caps.values()),
+    }
+    if normalize_refs:
+        payload["targets.json"] = store.target_table()
+        payload["conditions.json"] = store.condition_table()
+        payload["effects.json"] = list(store.normalized_effects())
+    else:
+        payload["effects.json"] = list(store.effects)
+    return payload
+
+
+def emit_outputs(
+    store: EntityStore, output_dir: Path, *, normalize_refs: bool = False, output_format: str = "json"
+) -> None:
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format {output_format}")
+    for name, rows in store_payload(store, normalize_refs=normalize_refs).items():
+        if output_format == "ndjson":
+            write_ndjson(output_dir, name, rows)
+        else:
+            write_json(output_dir, name, rows)
 
 
 def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
@@ -702,6 +848,23 @@ def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser.add_argument("--output", dest="output_dir", required=True, help="Directory to write JSON files.")
     parser.add_argument("--validate-only", action="store_true", help="Run parsing and validation without writing output files.")
     parser.add_argument("--mapping", dest="mapping", help="Optional JSON mapping file for aliases and pandoc path.")
+    parser.add_argument(
+        "--normalize-refs",
+        action="store_true",
+        help="Write targets.json and conditions.json lookup tables and reference them by ID from effects.json.",
+    )
+    parser.add_argument(
+        "--format",
+        dest="output_format",
+        choices=OUTPUT_FORMATS,
+        default="json",
+        help="json (default) or ndjson with a .index.json byte-offset sidecar per entity type.",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Check referential integrity of the outputs and exit non-zero (writing nothing) on failure.",
+    )
     return parser.parse_args(argv)
 
 
@@ -721,11 +884,19 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
         if args.validate_only:
             sys.exit(1)
 
+    if args.check:
+        integrity = validate_payload(store_payload(store, normalize_refs=args.normalize_refs))
+        print("Integrity report:")
+        print(integrity.summarize())
+        if integrity.has_errors():
+            sys.stderr.write("Referential integrity check failed; outputs not written.\n")
+            sys.exit(1)
+
     if args.validate_only:
         return
 
-    emit_outputs(store, output_dir)
-    print(f"Wrote JSON outputs to {output_dir}")
+    emit_outputs(store, output_dir, normalize_refs=args.normalize_refs, output_format=args.output_format)
+    print(f"Wrote {args.output_format.upper()} outputs to {output_dir}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,283 @@
+"""
+Long-running local parse service for race and skills text.
+
+Tooling and the authoring UI call the parser many times per build. Instead of
+paying interpreter startup and ``ParserConfig``/``RaceParser`` setup on every
+call, this module keeps one read-only config loaded and answers requests over
+HTTP (stdlib ``http.server``). Parse jobs run on a bounded worker pool and the
+service exposes request latency and throughput counters.
+
+Endpoints:
+- ``POST /parse`` with ``{"text": "..."}`` or ``{"path": "..."}`` and an
+  optional ``"normalize_refs": true``; returns the ``EntityStore`` payload and
+  the validation report.
+- ``GET /stats`` returns the request counters.
+- ``GET /healthz`` returns ``{"status": "ok"}``.
+
+``path`` requests may only name files under the input root (the working
+directory unless ``--input-root`` says otherwise), and request bodies larger
+than ``--max-body-bytes`` are refused with HTTP 413.
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Optional, Sequence
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from tools.parse_races import ParserConfig, RaceParser, convert_input_to_text, store_payload
+
+DEFAULT_MAX_BODY_BYTES = 8 * 1024 * 1024
+
+_worker_config: Optional[ParserConfig] = None
+
+
+def freeze_config(config: ParserConfig) -> ParserConfig:
+    """Return a copy of ``config`` whose alias tables cannot be mutated."""
+    return replace(
+        config,
+        attribute_aliases=MappingProxyType(dict(config.attribute_aliases)),
+        skill_aliases=MappingProxyType(dict(config.skill_aliases)),
+        language_aliases=MappingProxyType(dict(config.language_aliases)),
+        size_aliases=MappingProxyType(dict(config.size_aliases)),
+        known_lineages=tuple(config.known_lineages),
+        culture_lineage_map=MappingProxyType(dict(config.culture_lineage_map)),
+    )
+
+
+def _init_worker(config: ParserConfig) -> None:
+    global _worker_config
+    _worker_config = freeze_config(config)
+
+
+def _parse_job(
+    config: Optional[ParserConfig], text: Optional[str], path: Optional[str], normalize_refs: bool
+) -> Dict[str, object]:
+    config = config or _worker_config
+    if config is None:
+        raise RuntimeError("Worker config was not initialised")
+    if text is None:
+        text = convert_input_to_text(Path(path), config.pandoc_binary)
+    store, report = RaceParser(config).parse(text)
+    payload = store_payload(store, normalize_refs=normalize_refs)
+    return {
+        "store": {name.removesuffix(".json"): rows for name, rows in payload.items()},
+        "report": report.to_dict(),
+        "has_errors": report.has_errors(),
+    }
+
+
+class RequestError(ValueError):
+    """Raised for malformed parse requests; maps to HTTP 400."""
+
+
+class RequestTooLarge(RequestError):
+    """Raised when a request body exceeds the service limit; maps to HTTP 413."""
+
+
+@dataclass
+class ServiceStats:
+    started_at: float = field(default_factory=time.monotonic)
+    requests: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def begin(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+
+    def finish(self, latency: float, *, ok: bool) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.requests += 1
+            if not ok:
+                self.errors += 1
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            uptime = time.monotonic() - self.started_at
+            return {
+                "uptime_seconds": round(uptime, 3),
+                "requests": self.requests,
+                "errors": self.errors,
+                "in_flight": self.in_flight,
+                "latency_avg_ms": round(1000 * self.total_latency / self.requests, 3) if self.requests else 0.0,
+                "latency_max_ms": round(1000 * self.max_latency, 3),
+                "throughput_rps": round(self.requests / uptime, 3) if uptime else 0.0,
+            }
+
+
+class ParseService:
+    def __init__(
+        self,
+        config: ParserConfig,
+        *,
+        workers: int = 4,
+        use_processes: bool = False,
+        input_root: Optional[Path] = None,
+        max_body_bytes: int = DEFAULT_MAX_BODY_BYTES,
+    ) -> None:
+        self.config = freeze_config(config)
+        self.input_root = (input_root or Path.cwd()).resolve()
+        self.max_body_bytes = max_body_bytes
+        self.stats = ServiceStats()
+        self.executor: Executor
+        if use_processes:
+            # Worker processes receive the plain config once and freeze their own copy.
+            self.executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(config,))
+            self._job_config: Optional[ParserConfig] = None
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=workers)
+            self._job_config = self.config
+
+    def handle(self, request: Dict[str, object]) -> Dict[str, object]:
+        self.stats.begin()
+        started = time.monotonic()
+        ok = False
+        try:
+            text, path = self._resolve_input(request)
+            result = self.executor.submit(
+                _parse_job, self._job_config, text, path, bool(request.get("normalize_refs"))
+            ).result()
+            ok = True
+            return result
+        finally:
+            self.stats.finish(time.monotonic() - started, ok=ok)
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True)
+
+    def _resolve_input(self, request: Dict[str, object]) -> tuple:
+        text = request.get("text")
+        path = request.get("path")
+        if (text is None) == (path is None):
+            raise RequestError("Provide exactly one of 'text' or 'path'.")
+        if text is not None:
+            if not isinstance(text, str):
+                raise RequestError("'text' must be a string.")
+            return text, None
+        if not isinstance(path, str):
+            raise RequestError("'path' must be a string.")
+        resolved = (self.input_root / path).resolve()  # absolute paths replace the root
+        if not resolved.is_relative_to(self.input_root):
+            raise RequestError(f"Path is outside the input root: {path}")
+        if not resolved.is_file():
+            raise RequestError(f"No such file: {path}")
+        return None, str(resolved)
+
+
+class ParseRequestHandler(BaseHTTPRequestHandler):
+    server_version = "RaceParseService/1.0"
+    service: ParseService
+
+    def do_GET(self) -> None:
+        if self.path == "/stats":
+            self._send_json(200, self.service.stats.snapshot())
+        elif self.path == "/healthz":
+            self._send_json(200, {"status": "ok"})
+        else:
+            self._send_json(404, {"error": f"Unknown endpoint {self.path}"})
+
+    def do_POST(self) -> None:
+        if self.path != "/parse":
+            self._send_json(404, {"error": f"Unknown endpoint {self.path}"})
+            return
+        try:
+            length = self._content_length()
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(request, dict):
+                raise RequestError("Request body must be a JSON object.")
+            self._send_json(200, self.service.handle(request))
+        except RequestTooLarge as exc:
+            self.close_connection = True  # the unread body must not be parsed as the next request
+            self._send_json(413, {"error": str(exc)})
+        except (RequestError, json.JSONDecodeError) as exc:
+            self._send_json(400, {"error": str(exc)})
+        except SystemExit as exc:  # input conversion failures (missing pandoc/antiword)
+            self._send_json(422, {"error": str(exc)})
+        except Exception as exc:  # pragma: no cover - surfaced to the client rather than killing the server
+            self._send_json(500, {"error": str(exc)})
+
+    def _content_length(self) -> int:
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            raise RequestError("Content-Length must be an integer.") from None
+        if length < 0:
+            raise RequestError("Content-Length must not be negative.")
+        if length > self.service.max_body_bytes:
+            raise RequestTooLarge(f"Request body of {length} bytes exceeds the {self.service.max_body_bytes} byte limit.")
+        return length
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+    def _send_json(self, status: int, payload: object) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def make_server(service: ParseService, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    handler = type("BoundParseRequestHandler", (ParseRequestHandler,), {"service": service})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve race and skills parsing over HTTP with a warm parser config.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1).")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on (default: 8765).")
+    parser.add_argument("--mapping", dest="mapping", help="Optional JSON mapping file for aliases and pandoc path.")
+    parser.add_argument("--workers", type=int, default=4, help="Number of parse workers (default: 4).")
+    parser.add_argument("--processes", action="store_true", help="Run parse workers in processes instead of threads.")
+    parser.add_argument(
+        "--input-root",
+        help="Only accept 'path' requests for files under this directory (default: the working directory).",
+    )
+    parser.add_argument(
+        "--max-body-bytes",
+        type=int,
+        default=DEFAULT_MAX_BODY_BYTES,
+        help=f"Largest request body accepted (default: {DEFAULT_MAX_BODY_BYTES}).",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    config = ParserConfig.from_path(Path(args.mapping)) if args.mapping else ParserConfig()
+    service = ParseService(
+        config,
+        workers=args.workers,
+        use_processes=args.processes,
+        input_root=Path(args.input_root) if args.input_root else None,
+        max_body_bytes=args.max_body_bytes,
+    )
+    server = make_server(service, args.host, args.port)
+    print(f"Serving on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:  # pragma: no cover - interactive shutdown
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
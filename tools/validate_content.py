@@ -0,0 +1,236 @@
+"""
+Referential integrity validator for emitted content files.
+
+Files are checked in dependency order (reference tables before the rows that
+point at them). Each file is read in one pass that builds its hash-set index
+while checking its own rows, so the full check is linear in the number of
+rows. Checks:
+- ``id`` uniqueness in every file and ``code`` uniqueness in code tables;
+- culture ``lineage_id``, feature ``source_id`` and language grants resolve;
+- effect ``feature_id``, skill/attribute targets, ``target_id``,
+  ``condition_ids`` and ``magnitude.cap_table_id`` resolve;
+- ``effect_type``, ``condition_type`` and ``source_type`` use the ENUM values
+  in ``docs/ttrpg_data_schema.md``. Values the parsers emit that the schema
+  does not define yet are listed in the ``PROVISIONAL_*`` sets; they are
+  reported as warnings (one per value) rather than errors;
+- every ``deity_relationship_cap`` effect carries a ``magnitude.cap_table_id``.
+
+Both embedded effects and the ``--normalize-refs`` layout are accepted.
+"""
+import argparse
+import json
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+EFFECT_TYPES = frozenset(
+    {
+        "attribute_bonus",
+        "skill_bonus",
+        "resource_bonus",
+        "language_grant",
+        "damage_modifier",
+        "resistance",
+        "action_cost_mod",
+        "movement_mod",
+        "condition_immunity",
+        "critical_upgrade",
+        "advantage_rule",
+        "derived_stat_bonus",
+    }
+)
+CONDITION_TYPES = frozenset(
+    {
+        "environment",
+        "opponent_lineage",
+        "opponent_culture",
+        "lighting",
+        "adjacency",
+        "equipment_state",
+        "action_phase",
+        "usage_frequency",
+        "size_category",
+        "status",
+    }
+)
+SOURCE_TYPES = frozenset({"lineage", "culture", "background", "feat", "class", "item"})
+
+# Emitted by the parsers but not (yet) in the schema ENUMs. ``opponent``, ``while``,
+# ``when`` and ``if`` are catch-alls that carry unparsed predicate text.
+PROVISIONAL_EFFECT_TYPES = frozenset({"deity_relationship_cap", "divine_intervention"})
+PROVISIONAL_CONDITION_TYPES = frozenset({"ally_state", "opponent", "while", "when", "if"})
+PROVISIONAL_SOURCE_TYPES = frozenset({"ancillary", "deity"})
+
+# Files in dependency order; codes must be unique in the first group.
+CODE_TABLES = ("attributes.json", "skills.json", "languages.json", "lineages.json", "cultures.json")
+CONTENT_FILES = CODE_TABLES + ("features.json", "targets.json", "conditions.json", "deity_caps.json", "effects.json")
+
+
+@dataclass
+class IntegrityReport:
+    errors: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+    error_count: int = 0
+    rows_checked: int = 0
+    max_errors: int = 200
+
+    def add(self, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append(message)
+
+    def has_errors(self) -> bool:
+        return bool(self.error_count)
+
+    def summarize(self) -> str:
+        return json.dumps(
+            {
+                "rows_checked": self.rows_checked,
+                "error_count": self.error_count,
+                "errors": self.errors,
+                "warnings": self.warnings,
+            },
+            indent=2,
+        )
+
+
+class IntegrityValidator:
+    def __init__(self, *, max_errors: int = 200) -> None:
+        self.report = IntegrityReport(max_errors=max_errors)
+        self.ids: Dict[str, Set[str]] = {}
+        self.provisional: Dict[Tuple[str, str], int] = {}  # (field, value) -> rows using it
+
+    def validate(self, payload: Mapping[str, Iterable[Dict[str, object]]]) -> IntegrityReport:
+        for name in CONTENT_FILES:
+            if name in payload:
+                self._check_file(name, payload[name])
+        for (enum, value), count in sorted(self.provisional.items()):
+            self.report.warnings.append(f"{count} rows use provisional {enum} {value!r} (not in the schema ENUM)")
+        return self.report
+
+    def _check_file(self, name: str, rows: Iterable[Dict[str, object]]) -> None:
+        ids = self.ids.setdefault(name, set())
+        codes: Optional[Set[str]] = set() if name in CODE_TABLES else None
+        check_row = getattr(self, f"_check_{name.removesuffix('.json')}", None)
+        for row in rows:
+            self.report.rows_checked += 1
+            row_id = row.get("id")
+            if row_id is None:
+                self.report.add(f"{name}: row without id: {row}")
+            elif row_id in ids:
+                self.report.add(f"{name}: duplicate id {row_id}")
+            else:
+                ids.add(row_id)
+            if codes is not None:
+                code = row.get("code")
+                if code in codes:
+                    self.report.add(f"{name}: duplicate code {code} ({row_id})")
+                codes.add(code)
+            if check_row:
+                check_row(row_id, row)
+
+    def _resolve(self, table: str, ref: object, context: str) -> None:
+        if ref not in self.ids.get(table, ()):
+            self.report.add(f"{context}: unknown {table.removesuffix('.json')} reference {ref}")
+
+    def _check_languages_of(self, row_id: str, row: Dict[str, object], name: str) -> None:
+        for grant in row.get("languages") or []:
+            self._resolve("languages.json", grant.get("language_id"), f"{name} {row_id}")
+
+    def _check_lineages(self, row_id: str, row: Dict[str, object]) -> None:
+        self._check_languages_of(row_id, row, "lineages.json")
+
+    def _check_cultures(self, row_id: str, row: Dict[str, object]) -> None:
+        self._resolve("lineages.json", row.get("lineage_id"), f"cultures.json {row_id}")
+        self._check_languages_of(row_id, row, "cultures.json")
+
+    def _check_features(self, row_id: str, row: Dict[str, object]) -> None:
+        source_type = row.get("source_type")
+        self._check_enum("source_type", source_type, SOURCE_TYPES, PROVISIONAL_SOURCE_TYPES, f"features.json {row_id}")
+        if source_type in ("lineage", "culture"):
+            self._resolve(f"{source_type}s.json", row.get("source_id"), f"features.json {row_id}")
+
+    def _check_targets(self, row_id: str, row: Dict[str, object]) -> None:
+        self._check_target(row.get("target_ref") or {}, f"targets.json {row_id}")
+
+    def _check_conditions(self, row_id: str, row: Dict[str, object]) -> None:
+        self._check_condition(row, f"conditions.json {row_id}")
+
+    def _check_effects(self, row_id: str, row: Dict[str, object]) -> None:
+        context = f"effects.json {row_id}"
+        self._resolve("features.json", row.get("feature_id"), context)
+        effect_type = row.get("effect_type")
+        self._check_enum("effect_type", effect_type, EFFECT_TYPES, PROVISIONAL_EFFECT_TYPES, context)
+        if "target_id" in row:
+            self._resolve("targets.json", row["target_id"], context)
+        else:
+            self._check_target(row.get("target") or {}, context)
+        for condition_id in row.get("condition_ids") or []:
+            self._resolve("conditions.json", condition_id, context)
+        for condition in row.get("conditions") or []:
+            self._check_condition(condition, context)
+        magnitude = row.get("magnitude") or {}
+        if "cap_table_id" in magnitude:
+            self._resolve("deity_caps.json", magnitude["cap_table_id"], context)
+        elif effect_type == "deity_relationship_cap":
+            self.report.add(f"{context}: deity_relationship_cap effect has no magnitude.cap_table_id")
+
+    def _check_target(self, target: Dict[str, object], context: str) -> None:
+        target_type = target.get("type")
+        if target_type == "skill" and "id" in target:
+            self._resolve("skills.json", target["id"], context)
+        elif target_type == "attribute" and "id" in target:
+            self._resolve("attributes.json", target["id"], context)
+
+    def _check_condition(self, condition: Dict[str, object], context: str) -> None:
+        self._check_enum(
+            "condition_type", condition.get("condition_type"), CONDITION_TYPES, PROVISIONAL_CONDITION_TYPES, context
+        )
+
+    def _check_enum(
+        self, enum: str, value: object, allowed: frozenset, provisional: frozenset, context: str
+    ) -> None:
+        if value in allowed:
+            return
+        if value in provisional:
+            self.provisional[(enum, value)] = self.provisional.get((enum, value), 0) + 1
+        else:
+            self.report.add(f"{context}: {enum} {value!r} is not allowed")
+
+
+def validate_payload(payload: Mapping[str, Iterable[Dict[str, object]]], *, max_errors: int = 200) -> IntegrityReport:
+    return IntegrityValidator(max_errors=max_errors).validate(payload)
+
+
+def load_payload(output_dir: Path) -> Dict[str, List[Dict[str, object]]]:
+    payload: Dict[str, List[Dict[str, object]]] = {}
+    for name in CONTENT_FILES:
+        path = output_dir / name
+        ndjson_path = output_dir / f"{name.removesuffix('.json')}.ndjson"
+        if path.exists():
+            with path.open("r", encoding="utf-8") as handle:
+                payload[name] = json.load(handle)
+        elif ndjson_path.exists():
+            with ndjson_path.open("r", encoding="utf-8") as handle:
+                payload[name] = [json.loads(line) for line in handle if line.strip()]
+    return payload
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Check referential integrity of emitted content JSON files.")
+    parser.add_argument("output_dir", help="Directory holding the emitted JSON or NDJSON files.")
+    parser.add_argument("--max-errors", type=int, default=200, help="Maximum number of errors to list (default: 200).")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    report = validate_payload(load_payload(Path(args.output_dir)), max_errors=args.max_errors)
+    print(report.summarize())
+    if report.has_errors():
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()